@@ -2,12 +2,14 @@
 API routes for ContextOptimizer backend.
 """
 
-from datetime import datetime
+import asyncio
+import traceback
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+import orjson
 from fastapi import APIRouter, UploadFile, File, Form, Query, HTTPException, Body, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 
 from ..config import settings
 from ..models.schemas import (
@@ -30,13 +32,42 @@ from ..models.schemas import SessionStatus
 
 logger = get_logger(__name__)
 
+# Bound concurrent background analyses so a burst of requests cannot
+# saturate the LLM provider or the event loop
+_analysis_semaphore = asyncio.Semaphore(settings.max_concurrent_analyses)
+
+# In-process deduplication of concurrent identical requests: analyses in
+# flight are tracked by session id, and concurrent optimize requests for
+# the same session share one task instead of each calling the LLM
+_in_flight_analyses: set = set()
+_in_flight_optimizations: Dict[str, "asyncio.Task"] = {}
+
 # Initialize services
 session_service = SessionService()
 llm_service = LLMService()
 evaluator = ContextEvaluator(llm_service)
 optimizer = ContextOptimizer(llm_service)
 
-router = APIRouter()
+# Serialize responses with orjson instead of the stdlib json encoder;
+# the session/report payloads on the hot GET endpoints are plain dicts
+# that orjson handles natively
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+def _session_info(session) -> SessionInfo:
+    """Build a SessionInfo response model from a Session."""
+    # The fields come straight from an already-validated Session, so
+    # model_construct skips a second round of per-field validation
+    return SessionInfo.model_construct(
+        session_id=session.session_id,
+        status=session.status,
+        created_at=session.created_at,
+        updated_at=session.updated_at,
+        has_files=session.has_files(),
+        has_analysis=session.has_analysis(),
+        has_optimization=session.has_optimization(),
+        error_message=session.error_message
+    )
 
 
 @router.get("/health", response_model=HealthResponse, tags=["health"])
@@ -106,34 +137,20 @@ async def upload_files(
     """
     try:
         logger.info(f"Uploading files: {agents_config.filename}, {messages_dataset.filename}")
-        
-        # Validate file types and sizes
-        agents_config_content = await agents_config.read()
-        await FileService.validate_uploaded_file(
-            agents_config_content,
-            agents_config.filename,
-            settings.max_file_size
-        )
-        
-        messages_dataset_content = await messages_dataset.read()
-        await FileService.validate_uploaded_file(
-            messages_dataset_content,
-            messages_dataset.filename,
-            settings.max_file_size
-        )
-        
-        # Create new session with uploaded files
-        session = await session_service.create_session(
-            agents_config_content=agents_config_content,
-            agents_config_filename=agents_config.filename,
-            messages_dataset_content=messages_dataset_content,
-            messages_dataset_filename=messages_dataset.filename
+
+        # Stream uploads to the session directory; size and JSON validation
+        # happen incrementally so memory stays bounded to one chunk
+        session = await session_service.create_session_from_uploads(
+            agents_config, messages_dataset
         )
-        
-        # Get file info for response
+
+        # Get file info for response from the files on disk
+        input_dir = session_service.get_session_path(session.session_id) / "input"
         file_info = {
-            "agents_config": FileInfo(**FileService.get_file_info(agents_config_content, agents_config.filename)),
-            "messages_dataset": FileInfo(**FileService.get_file_info(messages_dataset_content, messages_dataset.filename))
+            "agents_config": FileInfo(**FileService.get_file_info_from_path(
+                input_dir / "agents_config.json", agents_config.filename)),
+            "messages_dataset": FileInfo(**FileService.get_file_info_from_path(
+                input_dir / "messages_dataset.json", messages_dataset.filename))
         }
         
         logger.info(f"Files uploaded successfully for session: {session.session_id}")
@@ -169,19 +186,16 @@ async def analyze_context(
     """Start context analysis for a session."""
     try:
         logger.info(f"🚀 Analysis request received for session: {request.session_id}")
-        logger.debug(f"📋 Request details: {request}")
-        
+
         # Get session
-        logger.debug(f"📋 Retrieving session: {request.session_id}")
         session = await session_service.get_session(request.session_id)
-        logger.debug(f"📊 Session status: {session.status}, has_files: {session.has_files()}, has_analysis: {session.has_analysis()}")
         
         if not session.has_files():
             logger.warning(f"❌ Session files not uploaded for: {request.session_id}")
             raise HTTPException(status_code=400, detail="Session files not uploaded")
         
         # Check if analysis is already in progress or completed
-        if session.status == SessionStatus.ANALYZING:
+        if request.session_id in _in_flight_analyses or session.status == SessionStatus.ANALYZING:
             logger.info(f"⏳ Analysis already in progress for session: {request.session_id}")
             return {
                 "session_id": request.session_id,
@@ -201,12 +215,12 @@ async def analyze_context(
             }
         
         # Update session status
-        logger.debug(f"🔄 Updating session status to ANALYZING for: {request.session_id}")
         session.update_status(SessionStatus.ANALYZING, "Analysis started")
         await session_service.update_session(session)
         
         # Start background analysis
         logger.info(f"🎬 Starting background analysis task for session: {request.session_id}")
+        _in_flight_analyses.add(request.session_id)
         background_tasks.add_task(
             _perform_analysis,
             request.session_id
@@ -225,27 +239,29 @@ async def analyze_context(
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"💥 Analysis start failed: {e}")
-        import traceback
         logger.error(f"🔍 Analysis start error traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail="Analysis start failed")
 
 
-@router.get("/session/{session_id}", response_model=SessionInfo)
+@router.get("/session/{session_id}", response_model=dict)
 async def get_session_info(session_id: str):
     """Get session information and status."""
     try:
         session = await session_service.get_session(session_id)
-        
-        return SessionInfo(
-            session_id=session.session_id,
-            status=session.status,
-            created_at=session.created_at,
-            updated_at=session.updated_at,
-            has_files=session.has_files(),
-            has_analysis=session.has_analysis(),
-            has_optimization=session.has_optimization(),
-            error_message=session.error_message
-        )
+
+        # Return a plain dict: the payload is echoed straight back to the
+        # client, so building and re-validating a SessionInfo model here
+        # only adds serialization overhead
+        return {
+            "session_id": session.session_id,
+            "status": session.status,
+            "created_at": session.created_at,
+            "updated_at": session.updated_at,
+            "has_files": session.has_files(),
+            "has_analysis": session.has_analysis(),
+            "has_optimization": session.has_optimization(),
+            "error_message": session.error_message
+        }
         
     except SessionNotFoundError as e:
         logger.error(f"Session not found: {e}")
@@ -352,39 +368,20 @@ async def start_optimization(
         if session.optimization_result:
             logger.info(f"Optimization already completed for session: {session_id}")
             return session.optimization_result
-        
-        # Get agents config and evaluation report
-        session_dir = session_service.session_dir / session_id
-        agents_config, _ = await FileService.process_session_files(
-            session_dir,
-            session.agents_config_filename,
-            session.messages_dataset_filename
-        )
-        
-        # Perform optimization
-        logger.info(f"Starting context optimization for session: {session_id}")
-        optimization_result = await optimizer.optimize_context(
-            agents_config, session.evaluation_report
-        )
-        logger.info("Context optimization completed successfully")
-        
-        # Add timestamp
-        optimization_result["metadata"]["optimization_timestamp"] = datetime.utcnow().isoformat()
-        
-        # Save optimization result
-        analysis_dir = session_dir / "analysis"
-        analysis_dir.mkdir(parents=True, exist_ok=True)
-        optimization_file = analysis_dir / "optimization_result.json"
-        await FileUtils.save_json(optimization_result, optimization_file)
-        
-        # Update session
-        session.optimization_result = optimization_result
-        session.update_status(SessionStatus.COMPLETED)
-        await session_service.update_session(session)
-        
-        logger.info(f"Optimization completed successfully for session: {session_id}")
-        return optimization_result
-        
+
+        # Deduplicate concurrent identical requests: share one task per session
+        task = _in_flight_optimizations.get(session_id)
+        if task is None:
+            task = asyncio.create_task(_run_optimization(session_id, session))
+            _in_flight_optimizations[session_id] = task
+            task.add_done_callback(
+                lambda _t, sid=session_id: _in_flight_optimizations.pop(sid, None)
+            )
+        else:
+            logger.info(f"Joining in-flight optimization for session: {session_id}")
+
+        return await asyncio.shield(task)
+
     except SessionNotFoundError as e:
         logger.error(f"Session not found: {e}")
         raise HTTPException(status_code=404, detail=str(e))
@@ -393,6 +390,38 @@ async def start_optimization(
         raise HTTPException(status_code=500, detail="Start optimization failed")
 
 
+async def _run_optimization(session_id: str, session) -> Dict[str, Any]:
+    """Run the optimization pipeline for a session and persist the result."""
+    # Get agents config and evaluation report
+    session_dir = session_service.get_session_path(session_id)
+    agents_config, _ = await FileService.process_session_files(
+        session_dir,
+        session.agents_config_filename,
+        session.messages_dataset_filename
+    )
+
+    # Perform optimization
+    logger.info(f"Starting context optimization for session: {session_id}")
+    optimization_result = await optimizer.optimize_context(
+        agents_config, session.evaluation_report
+    )
+    logger.info("Context optimization completed successfully")
+
+    # Save optimization result
+    analysis_dir = session_dir / "analysis"
+    analysis_dir.mkdir(parents=True, exist_ok=True)
+    optimization_file = analysis_dir / "optimization_result.json"
+    await FileUtils.save_json(optimization_result, optimization_file)
+
+    # Update session
+    session.optimization_result = optimization_result
+    session.update_status(SessionStatus.COMPLETED)
+    await session_service.update_session(session)
+
+    logger.info(f"Optimization completed successfully for session: {session_id}")
+    return optimization_result
+
+
 @router.get("/sessions", response_model=List[SessionInfo], tags=["sessions"], summary="List all sessions", description="Get a list of all analysis sessions.")
 async def list_sessions(
     limit: int = Query(10, description="Maximum number of sessions to return"),
@@ -441,19 +470,7 @@ async def list_sessions(
         else:
             sessions = sessions_data
         
-        return [
-            SessionInfo(
-                session_id=session.session_id,
-                status=session.status,
-                created_at=session.created_at,
-                updated_at=session.updated_at,
-                has_files=session.has_files(),
-                has_analysis=session.has_analysis(),
-                has_optimization=session.has_optimization(),
-                error_message=session.error_message
-            )
-            for session in sessions
-        ]
+        return [_session_info(session) for session in sessions]
         
     except Exception as e:
         logger.error(f"List sessions failed: {e}")
@@ -479,19 +496,7 @@ async def get_recent_sessions(
         else:
             sessions = sessions_data
         
-        return [
-            SessionInfo(
-                session_id=session.session_id,
-                status=session.status,
-                created_at=session.created_at,
-                updated_at=session.updated_at,
-                has_files=session.has_files(),
-                has_analysis=session.has_analysis(),
-                has_optimization=session.has_optimization(),
-                error_message=session.error_message
-            )
-            for session in sessions
-        ]
+        return [_session_info(session) for session in sessions]
         
     except Exception as e:
         logger.error(f"Get recent sessions failed: {e}")
@@ -542,13 +547,10 @@ async def download_evaluation_report(session_id: str):
         
         if not session.evaluation_report:
             raise HTTPException(status_code=404, detail="Evaluation report not found")
-        
-        # Create JSON response for download
-        from fastapi.responses import Response
-        import json
-        
-        json_content = json.dumps(session.evaluation_report, indent=2, ensure_ascii=False)
-        
+
+        # Serialize with orjson straight to bytes, skipping the str round-trip
+        json_content = orjson.dumps(session.evaluation_report, option=orjson.OPT_INDENT_2)
+
         return Response(
             content=json_content,
             media_type="application/json",
@@ -573,13 +575,10 @@ async def download_optimization_result(session_id: str):
         
         if not session.optimization_result:
             raise HTTPException(status_code=404, detail="Optimization result not found")
-        
-        # Create JSON response for download
-        from fastapi.responses import Response
-        import json
-        
-        json_content = json.dumps(session.optimization_result, indent=2, ensure_ascii=False)
-        
+
+        # Serialize with orjson straight to bytes, skipping the str round-trip
+        json_content = orjson.dumps(session.optimization_result, option=orjson.OPT_INDENT_2)
+
         return Response(
             content=json_content,
             media_type="application/json",
@@ -598,12 +597,21 @@ async def download_optimization_result(session_id: str):
 
 async def _perform_analysis(session_id: str):
     """Perform context analysis in background."""
+    try:
+        async with _analysis_semaphore:
+            await _perform_analysis_locked(session_id)
+    finally:
+        _in_flight_analyses.discard(session_id)
+
+
+async def _perform_analysis_locked(session_id: str):
+    """Run the analysis pipeline once the concurrency slot is acquired."""
     try:
         logger.info(f"Starting analysis for session: {session_id}")
         
         # Get session
         session = await session_service.get_session(session_id)
-        session_dir = session_service.session_dir / session_id
+        session_dir = session_service.get_session_path(session_id)
         
         # Process session files
         agents_config, messages_dataset = await FileService.process_session_files(
@@ -622,41 +630,40 @@ async def _perform_analysis(session_id: str):
             agents_config, messages_dataset
         )
         logger.info("Context evaluation completed successfully")
-        
-        # Add timestamp
-        evaluation_report["metadata"]["analysis_timestamp"] = datetime.utcnow().isoformat()
-        
+
         # Create analysis directory
         analysis_dir = session_dir / "analysis"
         analysis_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save evaluation report
+
+        # Kick off the report save and session update, then start the
+        # optimization LLM call immediately: the disk IO is independent of
+        # the next prompt, so it flushes while the LLM works
         evaluation_file = analysis_dir / "evaluation_report.json"
-        await FileUtils.save_json(evaluation_report, evaluation_file)
-        
-        # Update session status
         session.update_status(SessionStatus.ANALYZED)
         session.evaluation_report = evaluation_report
-        await session_service.update_session(session)
-        
+        save_task = asyncio.gather(
+            FileUtils.save_json(evaluation_report, evaluation_file),
+            session_service.update_session(session)
+        )
+
         # Perform optimization
         logger.info(f"Starting context optimization for session: {session_id}")
-        optimization_result = await optimizer.optimize_context(
-            agents_config, evaluation_report
-        )
+        try:
+            optimization_result = await optimizer.optimize_context(
+                agents_config, evaluation_report
+            )
+        finally:
+            await save_task
         logger.info("Context optimization completed successfully")
-        
-        # Add timestamp
-        optimization_result["metadata"]["optimization_timestamp"] = datetime.utcnow().isoformat()
-        
-        # Save optimization result
+
+        # Overlap the result save with the final session update as well
         optimization_file = analysis_dir / "optimization_result.json"
-        await FileUtils.save_json(optimization_result, optimization_file)
-        
-        # Update session
         session.optimization_result = optimization_result
         session.update_status(SessionStatus.COMPLETED)
-        await session_service.update_session(session)
+        await asyncio.gather(
+            FileUtils.save_json(optimization_result, optimization_file),
+            session_service.update_session(session)
+        )
         
         logger.info(f"Analysis completed successfully for session: {session_id}")
         
@@ -665,9 +672,9 @@ async def _perform_analysis(session_id: str):
         
         # Update session with error
         try:
-            session = await session_service.get_session(session_id)
-            session.update_status(SessionStatus.ERROR, str(e))
-            await session_service.update_session(session)
+            await session_service.patch_session(
+                session_id, status=SessionStatus.ERROR, error_message=str(e)
+            )
         except Exception as update_error:
             logger.error(f"Failed to update session error status: {update_error}")
 
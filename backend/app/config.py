@@ -5,6 +5,7 @@ Manages all configuration settings for the ContextOptimizer backend.
 """
 
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -12,7 +13,7 @@ try:
     from pydantic_settings import BaseSettings
 except ImportError:
     from pydantic import BaseSettings
-from pydantic import Field
+from pydantic import AliasChoices, Field
 
 
 class Settings(BaseSettings):
@@ -46,9 +47,47 @@ class Settings(BaseSettings):
     max_tokens: int = Field(default=32000, env="MAX_TOKENS")
     temperature: float = Field(default=0, env="TEMPERATURE")
     
+    # Analysis Configuration
+    max_concurrent_analyses: int = Field(default=2, env="MAX_CONCURRENT_ANALYSES")
+    # Fraction of appended messages below which a prior evaluation of the
+    # same agents config is reused instead of re-running the LLM
+    evaluation_delta_threshold: float = Field(default=0.1, env="EVALUATION_DELTA_THRESHOLD")
+    # Evaluation score at or above which optimization is skipped entirely.
+    # pydantic-settings only honours env names matching the field, so the
+    # short form needs an explicit alias (the long form stays accepted)
+    optimization_skip_threshold: float = Field(
+        default=8.5,
+        validation_alias=AliasChoices(
+            "OPT_SKIP_THRESHOLD", "OPTIMIZATION_SKIP_THRESHOLD"
+        )
+    )
+    # Approximate token budget for the message sample embedded in the
+    # evaluation prompt; long low-signal messages are truncated above it
+    # (0 disables compression)
+    prompt_message_token_budget: int = Field(default=8000, env="PROMPT_MESSAGE_TOKEN_BUDGET")
+
+    # Session Cache Configuration
+    session_cache_ttl: int = Field(default=60, env="SESSION_CACHE_TTL")  # seconds
+
+    # LLM Rate Limiting (0 disables the corresponding limit)
+    llm_requests_per_minute: int = Field(default=0, env="LLM_REQUESTS_PER_MINUTE")
+    llm_tokens_per_minute: int = Field(default=0, env="LLM_TOKENS_PER_MINUTE")
+    # Maximum in-flight LLM requests across all sessions (0 = unbounded)
+    llm_max_concurrent_calls: int = Field(default=8, env="LLM_MAX_CONCURRENT_CALLS")
+
     # LLM Cache Configuration
     use_llm_cache: bool = Field(default=True, env="USE_LLM_CACHE")
     llm_cache_ttl: int = Field(default=3600, env="LLM_CACHE_TTL")  # 1 hour in seconds
+    # online: call the API on cache miss; isolated: serve cache only and
+    # fail on miss (zero API cost during development); disabled: no cache
+    llm_cache_mode: str = Field(default="online", env="LLM_CACHE_MODE")
+    # Persist cached responses under session_dir/llm_cache so warmed
+    # entries survive restarts; off by default
+    llm_disk_cache: bool = Field(default=False, env="LLM_DISK_CACHE")
+    # Ask the provider to enforce JSON output (response_format json_object)
+    # instead of relying on prompt discipline; off by default because not
+    # every OpenAI-compatible base_url supports it
+    llm_force_json: bool = Field(default=False, env="LLM_FORCE_JSON")
     
     # CORS Configuration
     override_allowed_origins: bool = Field(default=False, env="OVERRIDE_ALLOWED_ORIGINS")
@@ -78,19 +117,26 @@ class Settings(BaseSettings):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        
+
         # Set default log file if not provided
         if self.log_file is None and self.log_dir:
             self.log_file = self.log_dir / "app.log"
         elif self.log_file and not self.log_file.is_absolute():
             self.log_file = Path(self.log_file).resolve()
-        
-        # Ensure directories exist
+
+    @cached_property
+    def _directories_created(self) -> bool:
+        """Create data directories once, on first actual use."""
         self.upload_dir.mkdir(parents=True, exist_ok=True)
         self.session_dir.mkdir(parents=True, exist_ok=True)
         if self.log_dir:
             self.log_dir.mkdir(parents=True, exist_ok=True)
-    
+        return True
+
+    def ensure_directories(self) -> None:
+        """Ensure data directories exist (no-op after the first call)."""
+        _ = self._directories_created
+
     @property
     def is_development(self) -> bool:
         """Check if running in development mode."""
@@ -102,5 +148,11 @@ class Settings(BaseSettings):
         return self.openai_api_key is not None and len(self.openai_api_key.strip()) > 0
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the memoized application settings instance."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
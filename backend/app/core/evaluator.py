@@ -2,18 +2,42 @@
 Context evaluation engine.
 """
 
-import json
+import copy
+import hashlib
 from typing import Dict, Any
 
+import orjson
+
+from ..config import settings
 from ..models.agent import AgentConfig
-from ..models.message import MessageDataset
+from ..models.message import MessageDataset, MessageType
 from ..services.llm_service import LLMService
+from ..services.rate_limiter import estimate_tokens
+from ..utils.cache import cache_manager
 from ..utils.exceptions import LLMServiceError
 from ..utils.logger import get_logger
+from ..utils.time_utils import utc_timestamp
 from .prompts import PromptTemplates
+from .serialization import dump_json, dump_model_json, dump_model_json_bytes
 
 logger = get_logger(__name__)
 
+# Characters kept from each end of a truncated message body
+_TRUNCATE_KEEP_CHARS = 200
+
+# LLM parameters for evaluation calls; hashed into the result cache key,
+# so both places always see the same values
+_EVALUATION_TEMPERATURE = 0.1
+_EVALUATION_MAX_TOKENS = 4000
+
+# Upper bound on remembered last evaluations (one per agents config)
+_LAST_EVALUATIONS_MAX = 32
+
+
+def _clamp_score(value: Any) -> float:
+    """Clamp a score into the valid 0-10 range."""
+    return max(0.0, min(10.0, float(value)))
+
 
 class ContextEvaluator:
     """Engine for evaluating Multi-Agent System context quality."""
@@ -21,6 +45,9 @@ class ContextEvaluator:
     def __init__(self, llm_service: LLMService):
         """Initialize evaluator with LLM service."""
         self.llm_service = llm_service
+        # Last full evaluation per agents-config hash, used to absorb
+        # small tail-appends to the dataset without a new LLM call
+        self._last_evaluations: Dict[str, tuple] = {}
     
     async def evaluate_context(
         self,
@@ -34,14 +61,51 @@ class ContextEvaluator:
             # Prepare data for evaluation
             agents_config_json = self._prepare_agents_config(agents_config)
             messages_dataset_json = self._prepare_messages_dataset(messages_dataset)
-            
+
+            # Content-addressable cache: identical (config, dataset) pairs
+            # are common during metric iteration and retries, and the result
+            # is deterministic for our near-zero temperature. Disabled cache
+            # mode bypasses it (and the delta reuse below) the same way
+            # call_llm bypasses the response cache
+            cache_key = None
+            config_key = None
+            if settings.use_llm_cache and settings.llm_cache_mode.lower() != "disabled":
+                cache_key = self._result_cache_key(
+                    agents_config_json, messages_dataset_json
+                )
+                cached_result = cache_manager.get(cache_key)
+                if cached_result is not None:
+                    logger.info("Using cached evaluation result")
+                    # Deep-copy so callers mutating the report cannot
+                    # corrupt the cached copy
+                    result = copy.deepcopy(cached_result)
+                    result["metadata"]["analysis_timestamp"] = utc_timestamp()
+                    return result
+
+                # No exact hit: if the dataset merely grew a little at the
+                # tail since the last evaluation of this agents config,
+                # reuse that verdict instead of re-running the LLM
+                config_key = hashlib.sha256(
+                    dump_model_json_bytes(agents_config)
+                ).hexdigest()
+                delta_result = self._reuse_recent_evaluation(
+                    config_key, messages_dataset
+                )
+                if delta_result is not None:
+                    return delta_result
+
+            # Compute the dataset summaries once; they feed both the prompt
+            # and the report metadata below
+            unique_tools = messages_dataset.get_unique_tools()
+            agent_names = agents_config.get_agent_names()
+
             # Generate evaluation prompt
             evaluation_prompt = PromptTemplates.get_evaluation_prompt(
                 agents_config=agents_config_json,
                 messages_sample=messages_dataset_json,
                 agent_count=len(agents_config.agents),
                 message_count=len(messages_dataset.messages),
-                tool_count=len(messages_dataset.get_unique_tools())
+                tool_count=len(unique_tools)
             )
             
             # Call LLM for evaluation
@@ -51,8 +115,8 @@ class ContextEvaluator:
                 response = await self.llm_service.call_llm(
                     prompt=evaluation_prompt,
                     system_prompt=PromptTemplates.EVALUATION_SYSTEM_PROMPT,
-                    max_tokens=4000,
-                    temperature=0.1
+                    max_tokens=_EVALUATION_MAX_TOKENS,
+                    temperature=_EVALUATION_TEMPERATURE
                 )
                 logger.info("LLM response received")
             except Exception as llm_error:
@@ -69,9 +133,21 @@ class ContextEvaluator:
             
             # Validate and enhance result
             evaluation_result = self._enhance_evaluation_result(
-                evaluation_result, agents_config, messages_dataset
+                evaluation_result, agents_config, messages_dataset,
+                unique_tools=unique_tools, agent_names=agent_names
             )
-            
+
+            if cache_key is not None:
+                cached_copy = copy.deepcopy(evaluation_result)
+                cache_manager.set(cache_key, cached_copy, settings.llm_cache_ttl)
+                if len(self._last_evaluations) >= _LAST_EVALUATIONS_MAX:
+                    self._last_evaluations.pop(next(iter(self._last_evaluations)))
+                self._last_evaluations[config_key] = (
+                    tuple(msg.id for msg in messages_dataset.messages),
+                    self._messages_signature(messages_dataset.messages),
+                    cached_copy
+                )
+
             logger.info("Context evaluation completed successfully")
             return evaluation_result
             
@@ -79,23 +155,148 @@ class ContextEvaluator:
             logger.error(f"Context evaluation failed: {e}")
             raise LLMServiceError(f"Context evaluation failed: {e}")
     
+    def _reuse_recent_evaluation(
+        self,
+        config_key: str,
+        messages_dataset: MessageDataset
+    ) -> Dict[str, Any]:
+        """Reuse the last verdict when the dataset only grew at the tail.
+
+        Multi-agent sessions append messages incrementally, so the previous
+        evaluation usually still holds when only a handful of new messages
+        arrived. Returns None when a full re-evaluation is needed.
+        """
+        previous = self._last_evaluations.get(config_key)
+        if previous is None:
+            return None
+
+        previous_ids, previous_signature, previous_result = previous
+        message_ids = tuple(msg.id for msg in messages_dataset.messages)
+        if not previous_ids or message_ids[:len(previous_ids)] != previous_ids:
+            return None
+
+        appended = len(message_ids) - len(previous_ids)
+        if appended / len(previous_ids) > settings.evaluation_delta_threshold:
+            return None
+
+        # Ids alone cannot tell an appended tail from a re-upload that
+        # edited message bodies while keeping ids, so the prefix content
+        # must hash to what was actually evaluated last time
+        prefix = messages_dataset.messages[:len(previous_ids)]
+        if self._messages_signature(prefix) != previous_signature:
+            return None
+
+        logger.info(
+            f"Reusing recent evaluation result ({appended} messages appended)"
+        )
+        unique_tools = messages_dataset.get_unique_tools()
+        result = copy.deepcopy(previous_result)
+        result["metadata"]["analysis_timestamp"] = utc_timestamp()
+        result["metadata"]["message_count"] = len(message_ids)
+        result["metadata"]["unique_tools"] = len(unique_tools)
+        result["metadata"]["tool_names"] = unique_tools
+        return result
+
+    @staticmethod
+    def _messages_signature(messages) -> str:
+        """Content hash over a sequence of messages.
+
+        Serializes each message directly rather than through the
+        per-instance JSON memo: memoizing tens of thousands of
+        message dumps would pin all of them for as long as the
+        dataset stays cached, and the hash consumes each dump
+        exactly once.
+        """
+        hasher = hashlib.sha256()
+        for message in messages:
+            hasher.update(orjson.dumps(
+                message.model_dump(
+                    mode="json", exclude_defaults=True, exclude_none=True
+                )
+            ))
+            hasher.update(b"|")
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _result_cache_key(agents_config_json: str, messages_dataset_json: str) -> str:
+        """Build a content hash over everything that shapes the evaluation."""
+        hasher = hashlib.sha256()
+        for part in (
+            agents_config_json,
+            messages_dataset_json,
+            PromptTemplates.EVALUATION_SYSTEM_PROMPT,
+            settings.openai_model,
+            str(_EVALUATION_TEMPERATURE),
+            str(_EVALUATION_MAX_TOKENS)
+        ):
+            hasher.update(part.encode())
+            hasher.update(b"|")
+        return f"eval:{hasher.hexdigest()}"
+
     def _prepare_agents_config(self, agents_config: AgentConfig) -> str:
         """Prepare agents config for LLM evaluation."""
-        config_dict = agents_config.model_dump()
-        return json.dumps(config_dict, indent=2, ensure_ascii=False)
+        return dump_model_json(agents_config)
     
     def _prepare_messages_dataset(self, messages_dataset: MessageDataset) -> str:
-        """Prepare messages dataset for LLM evaluation."""
-        dataset_dict = messages_dataset.model_dump()
-        return json.dumps(dataset_dict, indent=2, ensure_ascii=False)
+        """Prepare messages dataset for LLM evaluation.
+
+        When the full dump blows past the configured token budget, long
+        plain-text messages are truncated head-and-tail. Tool calls and
+        tool results carry the coordination signal the evaluation looks
+        for, so they are always kept at full fidelity; models also weigh
+        the middle of long prompts poorly, which is exactly the part
+        truncation drops.
+        """
+        dumped = dump_model_json(messages_dataset)
+        budget = settings.prompt_message_token_budget
+        if budget <= 0 or estimate_tokens(dumped) <= budget:
+            return dumped
+        compressed = self._compress_messages(messages_dataset)
+        logger.info(
+            f"Compressed message sample from ~{estimate_tokens(dumped)} "
+            f"to ~{estimate_tokens(compressed)} tokens"
+        )
+        return compressed
+
+    @staticmethod
+    def _compress_messages(messages_dataset: MessageDataset) -> str:
+        """Dump messages with long low-signal content truncated."""
+        keep = _TRUNCATE_KEEP_CHARS
+        compact = []
+        for message in messages_dataset.messages:
+            dumped = message.model_dump(
+                mode="json", exclude_defaults=True, exclude_none=True
+            )
+            content = dumped.get("content", "")
+            if (
+                len(content) > 2 * keep
+                and not message.tool_calls
+                and message.type != MessageType.TOOL
+            ):
+                omitted = len(content) - 2 * keep
+                dumped["content"] = (
+                    f"{content[:keep]} ...[{omitted} characters omitted]... "
+                    f"{content[-keep:]}"
+                )
+            compact.append(dumped)
+        return dump_json({"messages": compact})
     
     def _enhance_evaluation_result(
         self,
         evaluation_result: Dict[str, Any],
         agents_config: AgentConfig,
-        messages_dataset: MessageDataset
+        messages_dataset: MessageDataset,
+        unique_tools: list = None,
+        agent_names: list = None
     ) -> Dict[str, Any]:
         """Enhance evaluation result with additional metadata."""
+
+        # Reuse summaries precomputed by the caller; both require a full
+        # dataset scan, so recomputing them here would double the work
+        if unique_tools is None:
+            unique_tools = messages_dataset.get_unique_tools()
+        if agent_names is None:
+            agent_names = agents_config.get_agent_names()
         
         # Ensure required fields exist
         required_fields = {
@@ -112,19 +313,19 @@ class ContextEvaluator:
         
         # Add metadata
         evaluation_result["metadata"] = {
-            "analysis_timestamp": "2024-01-01T00:00:00Z",  # Will be set by caller
+            "analysis_timestamp": utc_timestamp(),
             "agent_count": len(agents_config.agents),
             "message_count": len(messages_dataset.messages),
-            "unique_tools": len(messages_dataset.get_unique_tools()),
-            "agent_names": agents_config.get_agent_names(),
-            "tool_names": messages_dataset.get_unique_tools()
+            "unique_tools": len(unique_tools),
+            "agent_names": agent_names,
+            "tool_names": unique_tools
         }
         
         # Validate scores
-        evaluation_result["overall_score"] = max(0.0, min(10.0, float(evaluation_result["overall_score"])))
-        
+        evaluation_result["overall_score"] = _clamp_score(evaluation_result["overall_score"])
+
         for dimension in evaluation_result["dimensions"]:
             if "score" in dimension:
-                dimension["score"] = max(0.0, min(10.0, float(dimension["score"])))
+                dimension["score"] = _clamp_score(dimension["score"])
         
         return evaluation_result
@@ -2,6 +2,135 @@
 LLM prompt templates for context evaluation and optimization.
 """
 
+from string import Formatter
+
+import orjson
+
+from ..models.schemas import (
+    EvaluationDimension,
+    OptimizedAgent,
+    PriorityIssue,
+    ToolFormatRecommendation,
+)
+
+
+def _example_block(example: dict) -> str:
+    """Dump a response example as a brace-escaped JSON fenced block.
+
+    The examples are built through the response models at import, so the
+    prompt cannot drift from the schema the parser expects; escaping the
+    braces programmatically here replaces the hand-maintained {{ }}
+    doubling the templates used to carry.
+    """
+    dumped = orjson.dumps(example, option=orjson.OPT_INDENT_2).decode()
+    return "```json\n" + dumped.replace("{", "{{").replace("}", "}}") + "\n```"
+
+
+# LLM-facing response examples. The nested entries are validated against
+# the schema models; the server-side fields (session_id, generated_at)
+# are added after parsing and deliberately left out
+_EVALUATION_RESPONSE_EXAMPLE = {
+    "overall_score": 7.5,
+    "dimensions": [
+        EvaluationDimension(
+            name="Prompt Clarity",
+            score=8.0,
+            description="Assessment of system prompt quality",
+            issues=[
+                "Agent 'supervisor' lacks clear error handling instructions",
+                "Agent 'browser_use_worker' has ambiguous task completion criteria",
+                "Tool usage guidance is inconsistent across agents"
+            ],
+            recommendations=[
+                "Add explicit error handling procedures to supervisor prompt",
+                "Define clear completion criteria for browser_use_worker tasks",
+                "Standardize tool usage guidance across all agents"
+            ]
+        ).model_dump()
+    ],
+    "priority_issues": [
+        PriorityIssue(
+            priority="high",
+            category="Context Flow",
+            description="Critical user requirements are lost when transferring from supervisor to worker agents",
+            impact="Workers execute tasks without full context, leading to incomplete or incorrect results",
+            solution="Implement a standardized context transfer protocol that includes user requirements, constraints, and success criteria",
+            affected_agents=["supervisor", "browser_use_worker", "coder_worker"]
+        ).model_dump()
+    ],
+    "summary": "Executive summary of findings",
+    "recommendations": [
+        "Implement standardized context transfer protocol",
+        "Add error recovery procedures to all agent prompts",
+        "Define clear task completion criteria",
+        "Standardize tool output formats"
+    ]
+}
+
+_OPTIMIZATION_RESPONSE_EXAMPLE = {
+    "optimized_agents": [
+        OptimizedAgent(
+            agent_id="supervisor",
+            agent_name="Supervisor Agent",
+            original_system_prompt="You are a supervisor agent responsible for coordinating multi-agent workflows...",
+            optimized_system_prompt="You are a supervisor agent responsible for coordinating multi-agent workflows. Your responsibilities include: 1) Analyzing user requests thoroughly, 2) Creating structured plans with clear success criteria, 3) Delegating tasks with complete context, 4) Monitoring execution progress, and 5) Handling errors and exceptions...",
+            changes_summary="Added explicit responsibilities, structured workflow, error handling procedures, and context transfer protocol. Clarified success criteria and added verification steps.",
+            tools=[
+                {
+                    "name": "think",
+                    "description": "Internal reasoning tool for complex planning and analysis"
+                }
+            ]
+        ).model_dump()
+    ],
+    "tool_format_recommendations": [
+        ToolFormatRecommendation(
+            tool_name="think",
+            current_format="Unstructured text output without clear sections or required elements",
+            recommended_format="Structured output with 'analysis', 'options', and 'recommendation' sections",
+            format_example={
+                "analysis": "Detailed analysis of the situation...",
+                "options": ["Option 1: ...", "Option 2: ...", "Option 3: ..."],
+                "recommendation": "Based on the analysis, Option 2 is recommended because..."
+            },
+            rationale="Structured format ensures comprehensive analysis, consideration of alternatives, and clear recommendations that can be effectively used by other agents"
+        ).model_dump()
+    ],
+    "implementation_guide": "Step-by-step guide for implementing these changes...",
+    "expected_improvements": [
+        "Improved context preservation between agents (+2.5 points)",
+        "Reduced error rates in tool usage (+1.8 points)",
+        "More consistent task execution across different scenarios (+2.0 points)"
+    ],
+    "compatibility_notes": [
+        "All changes maintain backward compatibility with existing tools",
+        "The new context transfer protocol requires updates to all agent prompts"
+    ]
+}
+
+
+def _compile_template(template: str):
+    """Pre-parse a format template into a fast render function.
+
+    str.format re-scans the whole multi-KB template (including unescaping
+    the doubled braces in the JSON examples) on every call. Parsing once at
+    import reduces each render to a join over precomputed segments.
+    """
+    segments = []
+    for literal, field, _spec, _conv in Formatter().parse(template):
+        if literal:
+            segments.append((False, literal))
+        if field is not None:
+            segments.append((True, field))
+    segments = tuple(segments)
+
+    def render(**values) -> str:
+        return "".join(
+            [str(values[text]) if is_field else text for is_field, text in segments]
+        )
+
+    return render
+
 
 class PromptTemplates:
     """Collection of prompt templates for LLM calls."""
@@ -61,7 +190,28 @@ Return your analysis in valid JSON format that strictly follows the output schem
 
 IMPORTANT: Your response must be a valid JSON object that can be parsed directly. Do not include any text before or after the JSON. Start your response with '{' and end with '}'. Do not use markdown code blocks or any other formatting."""
 
-    EVALUATION_PROMPT_TEMPLATE = """Please analyze the following Multi-Agent System configuration and conversation data:
+    # Static instructions come first and the per-session JSON last, so the
+    # instruction block extends the provider's cached prompt prefix across
+    # calls instead of being invalidated by the data that precedes it
+    EVALUATION_PROMPT_TEMPLATE = """Please analyze the Multi-Agent System configuration and conversation data provided at the end of this prompt.
+
+## Evaluation Instructions:
+
+Please provide a comprehensive evaluation covering the five dimensions
+defined in your system instructions (Prompt Clarity, Context Flow, Tool
+Integration, Error Handling, Coordination Logic), applying the detailed
+criteria listed there to the data below.
+
+## Analysis Requirements:
+
+- Focus on actionable improvements that would have the highest impact
+- Consider both the design of the system and its execution in the conversation
+- Provide quantified assessments with supporting evidence
+
+Return your analysis in the following JSON structure (lists may carry additional entries of the same shape):
+""" + _example_block(_EVALUATION_RESPONSE_EXAMPLE) + """
+
+Focus on identifying issues that, if fixed, would most significantly improve the system's performance and reliability.
 
 ## Agent Configuration:
 ```json
@@ -76,99 +226,7 @@ IMPORTANT: Your response must be a valid JSON object that can be parsed directly
 ## Analysis Context:
 - Total agents: {agent_count}
 - Total messages: {message_count}
-- Unique tools used: {tool_count}
-
-## Evaluation Instructions:
-
-Please provide a comprehensive evaluation focusing on the following dimensions:
-
-1. **System Prompt Quality**: 
-   - Analyze each agent's system prompt for clarity, completeness, and effectiveness
-   - Identify ambiguous instructions or missing guidance
-   - Evaluate whether roles and responsibilities are clearly defined
-   - Check if error handling procedures are specified
-   - Assess if the prompt provides sufficient context for the agent to operate effectively
-
-2. **Context Continuity**: 
-   - Examine how well context flows between agents and tools
-   - Identify instances of context loss during transfers
-   - Evaluate completeness of information in handoffs
-   - Check for redundant or unnecessary information transfers
-   - Assess if critical information is preserved throughout the conversation flow
-
-3. **Tool Usage Patterns**: 
-   - Evaluate tool integration and output structure
-   - Identify inconsistencies in tool input/output formats
-   - Assess appropriateness of tool selection for specific tasks
-   - Check if tool responses are properly processed and utilized
-   - Evaluate error handling for tool failures
-
-4. **Error Scenarios**: 
-   - Identify potential failure points and error handling gaps
-   - Evaluate robustness against common failure modes
-   - Assess recovery mechanisms for errors
-   - Check if errors are properly communicated between agents
-   - Identify missing fallback procedures
-
-5. **Coordination Effectiveness**: 
-   - Assess agent collaboration and task delegation
-   - Evaluate efficiency of workflow between agents
-   - Identify bottlenecks or redundancies in the process
-   - Check if task dependencies are properly managed
-   - Assess overall system coherence and goal alignment
-
-## Analysis Requirements:
-
-- Be specific and provide concrete examples from the provided data
-- Identify patterns and systemic issues rather than isolated incidents
-- Focus on actionable improvements that would have the highest impact
-- Consider both the design of the system and its execution in the conversation
-- Provide quantified assessments with supporting evidence
-
-Return your analysis in the following JSON structure:
-```json
-{{
-  "overall_score": 7.5,
-  "dimensions": [
-    {{
-      "name": "Prompt Clarity",
-      "score": 8.0,
-      "description": "Assessment of system prompt quality",
-      "issues": [
-        "Agent 'supervisor' lacks clear error handling instructions",
-        "Agent 'browser_use_worker' has ambiguous task completion criteria",
-        "Tool usage guidance is inconsistent across agents"
-      ],
-      "recommendations": [
-        "Add explicit error handling procedures to supervisor prompt",
-        "Define clear completion criteria for browser_use_worker tasks",
-        "Standardize tool usage guidance across all agents"
-      ]
-    }},
-    // Additional dimensions...
-  ],
-  "priority_issues": [
-    {{
-      "priority": "high",
-      "category": "Context Flow",
-      "description": "Critical user requirements are lost when transferring from supervisor to worker agents",
-      "impact": "Workers execute tasks without full context, leading to incomplete or incorrect results",
-      "solution": "Implement a standardized context transfer protocol that includes user requirements, constraints, and success criteria",
-      "affected_agents": ["supervisor", "browser_use_worker", "coder_worker"]
-    }},
-    // Additional priority issues...
-  ],
-  "summary": "Executive summary of findings",
-  "recommendations": [
-    "Implement standardized context transfer protocol",
-    "Add error recovery procedures to all agent prompts",
-    "Define clear task completion criteria",
-    "Standardize tool output formats"
-  ]
-}}
-```
-
-Focus on identifying issues that, if fixed, would most significantly improve the system's performance and reliability."""
+- Unique tools used: {tool_count}"""
 
     OPTIMIZATION_SYSTEM_PROMPT = """You are an expert Multi-Agent Systems engineer specializing in context optimization. Your task is to generate optimized agent configurations and tool format recommendations based on evaluation results.
 
@@ -232,116 +290,44 @@ Return optimized configurations in valid JSON format that strictly follows the o
 
 IMPORTANT: Your response must be a valid JSON object that can be parsed directly. Do not include any text before or after the JSON. Start your response with '{' and end with '}'. Do not use markdown code blocks or any other formatting."""
 
-    OPTIMIZATION_PROMPT_TEMPLATE = """Based on the evaluation results, please generate optimized configurations for the Multi-Agent System:
-
-## Current Agent Configuration:
-```json
-{agents_config}
-```
-
-## Evaluation Results:
-```json
-{evaluation_report}
-```
+    OPTIMIZATION_PROMPT_TEMPLATE = """Based on the evaluation results provided at the end of this prompt, please generate optimized configurations for the Multi-Agent System.
 
 ## Optimization Instructions:
 
-Your task is to generate optimized agent configurations and tool format recommendations that address the issues identified in the evaluation report. Focus on creating practical, implementable improvements that will enhance the system's performance, reliability, and maintainability.
+Generate optimized agent configurations and tool format recommendations that address the issues identified in the evaluation report below.
 
 ### Key Optimization Areas:
 
-1. **System Prompt Enhancement**:
-   - Rewrite ambiguous or unclear instructions
-   - Add missing guidance for error handling and edge cases
-   - Clarify roles, responsibilities, and boundaries
-   - Improve workflow and decision-making processes
-   - Add structured formats for important information
-   - Include examples where they would improve clarity
-
-2. **Context Flow Optimization**:
-   - Create standardized protocols for information transfer
-   - Specify essential information that must be included in handoffs
-   - Add verification steps to confirm successful context transfer
-   - Implement recovery procedures for context loss
-   - Reduce unnecessary information while preserving critical context
-
-3. **Tool Format Standardization**:
-   - Define consistent schemas for tool inputs and outputs
-   - Standardize error reporting from tools
-   - Create validation requirements for tool data
-   - Specify how to handle unexpected tool responses
-   - Provide clear examples of proper tool usage
-
-4. **Error Handling Improvement**:
-   - Add explicit detection mechanisms for common errors
-   - Create recovery procedures for failure scenarios
-   - Implement fallback options for critical operations
-   - Standardize error communication between agents
-   - Define escalation paths for unresolvable issues
-
-5. **Coordination Enhancement**:
-   - Clarify task allocation and delegation processes
-   - Improve management of dependencies between agents
-   - Add progress monitoring and reporting mechanisms
-   - Create conflict resolution procedures
-   - Optimize communication patterns for efficiency
+Apply the five optimization focus areas defined in your system
+instructions (System Prompt Enhancement, Context Flow Optimization, Tool
+Format Standardization, Error Handling Improvement, Coordination
+Enhancement), following the detailed guidance listed there.
 
 ## Requirements:
 
 - Address all high-priority issues identified in the evaluation
 - Aim to improve the overall system score to 8.5+
-- Maintain backward compatibility where possible
-- Focus on practical, implementable changes
 - Provide clear rationales for all modifications
 - Ensure optimizations work together coherently
 
-Please provide optimized configurations in the following JSON structure:
+Please provide optimized configurations in the following JSON structure (lists may carry additional entries of the same shape):
+""" + _example_block(_OPTIMIZATION_RESPONSE_EXAMPLE) + """
+
+Focus on creating a coherent, well-integrated set of optimizations that work together to address the system's most critical issues.
+
+## Current Agent Configuration:
 ```json
-{{
-  "optimized_agents": [
-    {{
-      "agent_id": "supervisor",
-      "agent_name": "Supervisor Agent",
-      "original_system_prompt": "You are a supervisor agent responsible for coordinating multi-agent workflows...",
-      "optimized_system_prompt": "You are a supervisor agent responsible for coordinating multi-agent workflows. Your responsibilities include: 1) Analyzing user requests thoroughly, 2) Creating structured plans with clear success criteria, 3) Delegating tasks with complete context, 4) Monitoring execution progress, and 5) Handling errors and exceptions...",
-      "changes_summary": "Added explicit responsibilities, structured workflow, error handling procedures, and context transfer protocol. Clarified success criteria and added verification steps.",
-      "tools": [
-        {{
-          "name": "think",
-          "description": "Internal reasoning tool for complex planning and analysis"
-        }}
-      ]
-    }}
-  ],
-  "tool_format_recommendations": [
-    {{
-      "tool_name": "think",
-      "current_format": "Unstructured text output without clear sections or required elements",
-      "recommended_format": "Structured output with 'analysis', 'options', and 'recommendation' sections",
-      "format_example": {{
-        "analysis": "Detailed analysis of the situation...",
-        "options": ["Option 1: ...", "Option 2: ...", "Option 3: ..."],
-        "recommendation": "Based on the analysis, Option 2 is recommended because..."
-      }},
-      "rationale": "Structured format ensures comprehensive analysis, consideration of alternatives, and clear recommendations that can be effectively used by other agents"
-    }}
-  ],
-  "implementation_guide": "Step-by-step guide for implementing these changes...",
-  "expected_improvements": [
-    "Improved context preservation between agents (+2.5 points)",
-    "Reduced error rates in tool usage (+1.8 points)",
-    "More consistent task execution across different scenarios (+2.0 points)"
-  ],
-  "compatibility_notes": [
-    "All changes maintain backward compatibility with existing tools",
-    "The new context transfer protocol requires updates to all agent prompts"
-  ]
-}}
+{agents_config}
 ```
 
-Focus on creating a coherent, well-integrated set of optimizations that work together to address the system's most critical issues."""
-
+## Evaluation Results:
+```json
+{evaluation_report}
+```"""
 
+    # Templates pre-parsed at import so each call is a segment join
+    _render_evaluation_prompt = staticmethod(_compile_template(EVALUATION_PROMPT_TEMPLATE))
+    _render_optimization_prompt = staticmethod(_compile_template(OPTIMIZATION_PROMPT_TEMPLATE))
 
     @classmethod
     def get_evaluation_prompt(
@@ -353,14 +339,14 @@ Focus on creating a coherent, well-integrated set of optimizations that work tog
         tool_count: int
     ) -> str:
         """Get evaluation prompt with data."""
-        return cls.EVALUATION_PROMPT_TEMPLATE.format(
+        return cls._render_evaluation_prompt(
             agents_config=agents_config,
             messages_sample=messages_sample,
             agent_count=agent_count,
             message_count=message_count,
             tool_count=tool_count
         )
-    
+
     @classmethod
     def get_optimization_prompt(
         cls,
@@ -368,7 +354,7 @@ Focus on creating a coherent, well-integrated set of optimizations that work tog
         evaluation_report: str
     ) -> str:
         """Get optimization prompt with data."""
-        return cls.OPTIMIZATION_PROMPT_TEMPLATE.format(
+        return cls._render_optimization_prompt(
             agents_config=agents_config,
             evaluation_report=evaluation_report
         )
@@ -0,0 +1,60 @@
+"""
+Shared serialization helpers for the core engines.
+"""
+
+import weakref
+from typing import Any, Dict, List
+
+import orjson
+
+# Memoized dumps keyed by instance id; the weakref guards against id reuse
+# and evicts the entry when the model is garbage collected. Entries hold
+# [weakref, bytes, str | None]: the raw bytes (for hashing) plus the
+# decoded string (for prompt builds), filled in lazily because callers
+# that only hash never need the str copy.
+_model_json_cache: Dict[int, List[Any]] = {}
+
+
+def dump_json(data: Any) -> str:
+    """Serialize plain JSON-compatible data (dicts, lists) compactly."""
+    return orjson.dumps(data).decode()
+
+
+def dump_model_json_bytes(model: Any) -> bytes:
+    """Serialize a Pydantic model to compact JSON bytes, memoized per instance.
+
+    The evaluator and the optimizer both serialize the same AgentConfig
+    object within one analysis run; memoizing on the live instance lets the
+    optimizer reuse the JSON the evaluator already produced. The output is
+    compact: indentation whitespace only adds prompt tokens.
+    """
+    cached = _cache_entry(model)
+    return cached[1]
+
+
+def dump_model_json(model: Any) -> str:
+    """String form of :func:`dump_model_json_bytes` for prompt splicing."""
+    cached = _cache_entry(model)
+    if cached[2] is None:
+        cached[2] = cached[1].decode()
+    return cached[2]
+
+
+def _cache_entry(model: Any) -> List[Any]:
+    key = id(model)
+    cached = _model_json_cache.get(key)
+    if cached is not None and cached[0]() is model:
+        return cached
+
+    # Default and None fields carry no signal for the LLM; excluding them
+    # shrinks sparse message dumps substantially
+    dumped = orjson.dumps(
+        model.model_dump(mode="json", exclude_defaults=True, exclude_none=True)
+    )
+
+    def _evict(_ref, _key=key):
+        _model_json_cache.pop(_key, None)
+
+    entry = [weakref.ref(model, _evict), dumped, None]
+    _model_json_cache[key] = entry
+    return entry
@@ -2,11 +2,11 @@
 ContextOptimizer FastAPI application.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from .config import settings
 from .api.routes import router
@@ -28,6 +28,40 @@ from .utils.exceptions import (
 # Setup logging
 logger = get_logger()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown lifecycle."""
+    logger.info("Starting ContextOptimizer API")
+    logger.info(f"App: {settings.app_name} v{settings.app_version}")
+    logger.info(f"Debug mode: {settings.debug}")
+    logger.info(f"Upload directory: {settings.upload_dir}")
+    logger.info(f"Session directory: {settings.session_dir}")
+
+    # Directory creation is a cached no-op after the first call anywhere
+    settings.ensure_directories()
+
+    # Expired cache entries are evicted by a periodic sweep so reads
+    # stay off the lock
+    from .utils.cache import cache_manager
+    cache_manager.start_sweeper()
+
+    logger.info("ContextOptimizer API started successfully")
+
+    yield
+
+    logger.info("Shutting down ContextOptimizer API")
+
+    cache_manager.stop_sweeper()
+
+    # Flush any session updates still waiting in the write-ahead log
+    from .api.routes import session_service, llm_service
+    await session_service.flush_pending_sessions()
+
+    # Release pooled HTTP connections held by the LLM client
+    await llm_service.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="ContextOptimizer API",
@@ -92,44 +126,26 @@ app = FastAPI(
     license_info={
         "name": "MIT",
         "url": "https://opensource.org/licenses/MIT"
-    }
+    },
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add CORS middleware. Explicit method/header lists let the middleware
+# answer preflights from a fixed allow-list instead of reflecting every
+# request, and keep response headers small; the API only serves GET,
+# POST, and DELETE routes
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["content-type", "authorization"],
 )
 
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Application startup event."""
-    logger.info("Starting ContextOptimizer API")
-    logger.info(f"App: {settings.app_name} v{settings.app_version}")
-    logger.info(f"Debug mode: {settings.debug}")
-    logger.info(f"Upload directory: {settings.upload_dir}")
-    logger.info(f"Session directory: {settings.session_dir}")
-    
-    # Ensure directories exist
-    settings.upload_dir.mkdir(parents=True, exist_ok=True)
-    settings.session_dir.mkdir(parents=True, exist_ok=True)
-    
-    logger.info("ContextOptimizer API started successfully")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Application shutdown event."""
-    logger.info("Shutting down ContextOptimizer API")
-
-
 @app.get("/", tags=["health"])
 async def root():
     """Root endpoint."""
@@ -142,54 +158,35 @@ async def root():
     }
 
 
-@app.exception_handler(ValidationError)
-async def validation_error_handler(request: Request, exc: ValidationError):
-    """Handle validation errors."""
-    logger.warning(f"Validation error: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=400,
-        content=exc.to_dict()
-    )
+# Application exceptions mapped to (status code, log level). One shared
+# handler factory replaces the previous stack of near-identical decorated
+# functions; RateLimitError stays separate for its Retry-After header.
+_EXCEPTION_HANDLERS = [
+    (ValidationError, 400, "warning"),
+    (FileProcessingError, 400, "error"),
+    (SessionNotFoundError, 404, "warning"),
+    (LLMServiceError, 502, "error"),
+    (ConfigurationError, 500, "error"),
+    (DataConsistencyError, 400, "error"),
+    (AnalysisError, 500, "error"),
+    (OptimizationError, 500, "error"),
+    (TimeoutError, 504, "error"),
+    (ContextOptimizerException, 500, "error"),
+]
 
 
-@app.exception_handler(FileProcessingError)
-async def file_processing_error_handler(request: Request, exc: FileProcessingError):
-    """Handle file processing errors."""
-    logger.error(f"File processing error: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=400,
-        content=exc.to_dict()
-    )
+def _make_exception_handler(status_code: int, log_level: str):
+    """Build an exception handler with a fixed status code and log level."""
+    async def handler(request: Request, exc: ContextOptimizerException):
+        getattr(logger, log_level)(
+            f"{type(exc).__name__}: {exc.message}", exc_info=settings.debug
+        )
+        return ORJSONResponse(status_code=status_code, content=exc.to_dict())
+    return handler
 
 
-@app.exception_handler(SessionNotFoundError)
-async def session_not_found_error_handler(request: Request, exc: SessionNotFoundError):
-    """Handle session not found errors."""
-    logger.warning(f"Session not found: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=404,
-        content=exc.to_dict()
-    )
-
-
-@app.exception_handler(LLMServiceError)
-async def llm_service_error_handler(request: Request, exc: LLMServiceError):
-    """Handle LLM service errors."""
-    logger.error(f"LLM service error: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=502,
-        content=exc.to_dict()
-    )
-
-
-@app.exception_handler(ConfigurationError)
-async def configuration_error_handler(request: Request, exc: ConfigurationError):
-    """Handle configuration errors."""
-    logger.error(f"Configuration error: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=500,
-        content=exc.to_dict()
-    )
+for _exc_cls, _status, _level in _EXCEPTION_HANDLERS:
+    app.add_exception_handler(_exc_cls, _make_exception_handler(_status, _level))
 
 
 @app.exception_handler(RateLimitError)
@@ -199,63 +196,13 @@ async def rate_limit_error_handler(request: Request, exc: RateLimitError):
     headers = {}
     if "retry_after" in exc.details:
         headers["Retry-After"] = str(exc.details["retry_after"])
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=429,
         headers=headers,
         content=exc.to_dict()
     )
 
 
-@app.exception_handler(DataConsistencyError)
-async def data_consistency_error_handler(request: Request, exc: DataConsistencyError):
-    """Handle data consistency errors."""
-    logger.error(f"Data consistency error: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=400,
-        content=exc.to_dict()
-    )
-
-
-@app.exception_handler(AnalysisError)
-async def analysis_error_handler(request: Request, exc: AnalysisError):
-    """Handle analysis errors."""
-    logger.error(f"Analysis error: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=500,
-        content=exc.to_dict()
-    )
-
-
-@app.exception_handler(OptimizationError)
-async def optimization_error_handler(request: Request, exc: OptimizationError):
-    """Handle optimization errors."""
-    logger.error(f"Optimization error: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=500,
-        content=exc.to_dict()
-    )
-
-
-@app.exception_handler(TimeoutError)
-async def timeout_error_handler(request: Request, exc: TimeoutError):
-    """Handle timeout errors."""
-    logger.error(f"Timeout error: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=504,
-        content=exc.to_dict()
-    )
-
-
-@app.exception_handler(ContextOptimizerException)
-async def context_optimizer_exception_handler(request: Request, exc: ContextOptimizerException):
-    """Handle general ContextOptimizer exceptions."""
-    logger.error(f"ContextOptimizer exception: {exc.message}", exc_info=settings.debug)
-    return JSONResponse(
-        status_code=500,
-        content=exc.to_dict()
-    )
-
-
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
@@ -2,13 +2,16 @@
 Agent-related data models.
 """
 
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from functools import cached_property
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 class AgentTool(BaseModel):
     """Model for agent tool configuration."""
-    
+
+    model_config = ConfigDict(frozen=True, extra="ignore", str_strip_whitespace=True)
+
     name: str = Field(..., description="Tool name")
     description: str = Field(..., description="Tool description")
     parameters: Optional[dict] = Field(default=None, description="Tool parameters schema")
@@ -16,33 +19,84 @@ class AgentTool(BaseModel):
 
 class Agent(BaseModel):
     """Model for individual agent configuration."""
-    
+
+    # Agents are read-only after upload; freezing skips copy-on-validation
+    # and a tuple of tools trims per-instance overhead for large configs
+    model_config = ConfigDict(frozen=True, extra="ignore", str_strip_whitespace=True)
+
     agent_id: str = Field(..., description="Unique agent identifier")
     agent_name: str = Field(..., description="Human-readable agent name")
     version: str = Field(default="1.0", description="Agent version")
     system_prompt: str = Field(..., description="System prompt for the agent")
-    tools: List[AgentTool] = Field(default_factory=list, description="Available tools")
+    tools: Tuple[AgentTool, ...] = Field(default_factory=tuple, description="Available tools")
     metadata: Optional[dict] = Field(default=None, description="Additional metadata")
 
+    @cached_property
+    def tools_dump(self) -> List[dict]:
+        """Tool configurations dumped to plain dicts, memoized per instance.
+
+        Agents are not mutated after loading, so the dump is computed once
+        instead of re-walking the tool models on every consumer.
+        """
+        return [tool.model_dump() for tool in self.tools]
+
 
 class AgentConfig(BaseModel):
     """Model for complete agent configuration file."""
-    
+
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     agents: List[Agent] = Field(..., description="List of agent configurations")
     version: Optional[str] = Field(default="1.0", description="Configuration version")
     metadata: Optional[dict] = Field(default=None, description="Configuration metadata")
     
+    @cached_property
+    def _agents_by_id(self) -> dict:
+        """Agents indexed by id, built on first lookup.
+
+        Configurations are not mutated after loading, so the index turns
+        the repeated per-lookup scans into single dict probes.
+        """
+        return {agent.agent_id: agent for agent in self.agents}
+
     def get_agent_by_id(self, agent_id: str) -> Optional[Agent]:
         """Get agent by ID."""
-        for agent in self.agents:
-            if agent.agent_id == agent_id:
-                return agent
-        return None
-    
+        return self._agents_by_id.get(agent_id)
+
     def get_agent_names(self) -> List[str]:
         """Get list of all agent names."""
         return [agent.agent_name for agent in self.agents]
-    
+
     def get_agent_ids(self) -> List[str]:
         """Get list of all agent IDs."""
-        return [agent.agent_id for agent in self.agents]
+        return list(self._agents_by_id)
+
+    @cached_property
+    def tool_names(self) -> frozenset:
+        """Names of all tools defined across agents, computed once.
+
+        Cross-validation and prompt builds both need this set; the frozen
+        models make caching it safe.
+        """
+        return frozenset(
+            tool.name for agent in self.agents for tool in agent.tools
+        )
+
+    @property
+    def tool_count(self) -> int:
+        """Number of distinct tools defined across agents."""
+        return len(self.tool_names)
+
+    @classmethod
+    def from_agent_dicts(cls, agents: List[dict]) -> "AgentConfig":
+        """Build a configuration from normalized agent dicts.
+
+        Validates the agent list through the compiled TypeAdapter (the
+        Rust-level batch path in pydantic v2) and skips re-validating the
+        outer wrapper, which only holds the list plus defaulted metadata.
+        """
+        return cls.model_construct(agents=_AGENTS_ADAPTER.validate_python(agents))
+
+
+# Compiled once at import; reused for every uploaded configuration
+_AGENTS_ADAPTER = TypeAdapter(List[Agent])
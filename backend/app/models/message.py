@@ -2,7 +2,8 @@
 Message-related data models.
 """
 
-from typing import List, Optional, Any, Dict
+from functools import cached_property
+from typing import List, Optional, Any, Dict, Tuple
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -45,33 +46,48 @@ class MessageDataset(BaseModel):
     messages: List[Message] = Field(..., description="List of messages")
     metadata: Optional[dict] = Field(default=None, description="Dataset metadata")
     
+    @cached_property
+    def _scan(self) -> Tuple[frozenset, frozenset, tuple, dict, dict]:
+        """Fused single pass over the messages, computed once.
+
+        Validation, evaluation, and the report metadata each ask for a
+        different summary; walking the dataset once per summary multiplies
+        the traversal cost on large logs. The dataset is immutable after
+        validation, so one pass builds them all.
+        """
+        agents = set()
+        tools = set()
+        tool_calls: List[ToolCall] = []
+        by_type: Dict[MessageType, List[Message]] = {}
+        by_name: Dict[str, List[Message]] = {}
+        for message in self.messages:
+            if message.tool_calls:
+                tool_calls.extend(message.tool_calls)
+                for tool_call in message.tool_calls:
+                    tools.add(tool_call.name)
+            if message.name:
+                by_name.setdefault(message.name, []).append(message)
+                if message.type == MessageType.AI:
+                    agents.add(message.name)
+            by_type.setdefault(message.type, []).append(message)
+        return frozenset(agents), frozenset(tools), tuple(tool_calls), by_type, by_name
+
     def get_messages_by_type(self, message_type: MessageType) -> List[Message]:
         """Get messages by type."""
-        return [msg for msg in self.messages if msg.type == message_type]
-    
+        return list(self._scan[3].get(message_type, ()))
+
     def get_messages_by_agent(self, agent_name: str) -> List[Message]:
         """Get messages by agent name."""
-        return [msg for msg in self.messages if msg.name == agent_name]
-    
+        return list(self._scan[4].get(agent_name, ()))
+
     def get_tool_calls(self) -> List[ToolCall]:
         """Get all tool calls from all messages."""
-        tool_calls = []
-        for message in self.messages:
-            tool_calls.extend(message.tool_calls)
-        return tool_calls
-    
+        return list(self._scan[2])
+
     def get_unique_agents(self) -> List[str]:
         """Get list of unique agent names."""
-        agents = set()
-        for message in self.messages:
-            if message.name and message.type == MessageType.AI:
-                agents.add(message.name)
-        return list(agents)
-    
+        return list(self._scan[0])
+
     def get_unique_tools(self) -> List[str]:
         """Get list of unique tool names."""
-        tools = set()
-        for message in self.messages:
-            for tool_call in message.tool_calls:
-                tools.add(tool_call.name)
-        return list(tools)
+        return list(self._scan[1])
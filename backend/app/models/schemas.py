@@ -2,11 +2,16 @@
 API request/response schemas.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
 
 from .session import SessionStatus
+from ..utils.time_utils import utc_now
+
+# Shared 0-10 score type; the annotated alias lets pydantic reuse one
+# compiled range-check schema across every scored field
+Score = Annotated[float, Field(ge=0, le=10)]
 
 
 class UploadRequest(BaseModel):
@@ -34,7 +39,7 @@ class EvaluationDimension(BaseModel):
     """Model for evaluation dimension."""
     
     name: str = Field(..., description="Dimension name")
-    score: float = Field(..., ge=0, le=10, description="Score from 0 to 10")
+    score: Score = Field(..., description="Score from 0 to 10")
     description: str = Field(..., description="Dimension description")
     issues: List[str] = Field(default_factory=list, description="Identified issues")
     recommendations: List[str] = Field(default_factory=list, description="Recommendations")
@@ -55,12 +60,12 @@ class EvaluationReport(BaseModel):
     """Model for evaluation report."""
     
     session_id: str = Field(..., description="Session ID")
-    overall_score: float = Field(..., ge=0, le=10, description="Overall score")
+    overall_score: Score = Field(..., description="Overall score")
     dimensions: List[EvaluationDimension] = Field(..., description="Evaluation dimensions")
     priority_issues: List[PriorityIssue] = Field(default_factory=list, description="Priority issues")
     summary: str = Field(..., description="Executive summary")
     recommendations: List[str] = Field(default_factory=list, description="Overall recommendations")
-    generated_at: datetime = Field(default_factory=datetime.utcnow, description="Generation timestamp")
+    generated_at: datetime = Field(default_factory=utc_now, description="Generation timestamp")
 
 
 class OptimizedAgent(BaseModel):
@@ -95,7 +100,7 @@ class OptimizationResult(BaseModel):
     implementation_guide: str = Field(..., description="Implementation guide")
     expected_improvements: List[str] = Field(default_factory=list, description="Expected improvements")
     compatibility_notes: List[str] = Field(default_factory=list, description="Compatibility notes")
-    generated_at: datetime = Field(default_factory=datetime.utcnow, description="Generation timestamp")
+    generated_at: datetime = Field(default_factory=utc_now, description="Generation timestamp")
 
 
 class AnalysisResponse(BaseModel):
@@ -154,7 +159,7 @@ class AnalysisResult(BaseModel):
     session_id: str = Field(..., description="Session ID")
     status: str = Field(..., description="Analysis status")
     message: str = Field(..., description="Result message")
-    completed_at: datetime = Field(default_factory=datetime.utcnow, description="Completion timestamp")
+    completed_at: datetime = Field(default_factory=utc_now, description="Completion timestamp")
     details: Optional[Dict[str, Any]] = Field(default=None, description="Additional details")
 
 
@@ -3,10 +3,12 @@ Session-related data models.
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
 
+from ..utils.time_utils import utc_now
+
 
 class SessionStatus(str, Enum):
     """Session status enumeration."""
@@ -21,17 +23,11 @@ class SessionStatus(str, Enum):
 
 class Session(BaseModel):
     """Model for analysis session."""
-    
-    model_config = {
-        "json_encoders": {
-            datetime: lambda v: v.isoformat() if v else None
-        }
-    }
-    
+
     session_id: str = Field(..., description="Unique session identifier")
     status: SessionStatus = Field(default=SessionStatus.CREATED, description="Session status")
-    created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
+    created_at: datetime = Field(default_factory=utc_now, description="Creation timestamp")
+    updated_at: datetime = Field(default_factory=utc_now, description="Last update timestamp")
     
     # File information
     agents_config_filename: Optional[str] = Field(default=None, description="Agents config filename")
@@ -50,11 +46,36 @@ class Session(BaseModel):
     
     # Metadata
     metadata: Optional[Dict[str, Any]] = Field(default=None, description="Additional metadata")
-    
+
+    # Cached lowercased search haystack, keyed by updated_at so it
+    # recomputes after mutations
+    _search_blob: Optional[Tuple[datetime, str]] = PrivateAttr(default=None)
+
+    @property
+    def search_blob(self) -> str:
+        """Lowercased haystack for session search.
+
+        list_sessions matches the query against the session id, original
+        filenames, and error message; lowercasing each of them per query
+        made search cost scale with every listed session. One joined
+        blob is built per session and reused until the session changes.
+        """
+        cached = self._search_blob
+        if cached is not None and cached[0] == self.updated_at:
+            return cached[1]
+        parts = [self.session_id.lower()]
+        if self.original_filenames:
+            parts.extend(f.lower() for f in self.original_filenames.values())
+        if self.error_message:
+            parts.append(self.error_message.lower())
+        blob = "\n".join(parts)
+        self._search_blob = (self.updated_at, blob)
+        return blob
+
     def update_status(self, status: SessionStatus, error_message: Optional[str] = None):
         """Update session status and timestamp."""
         self.status = status
-        self.updated_at = datetime.utcnow()
+        self.updated_at = utc_now()
         if error_message:
             self.error_message = error_message
             if status != SessionStatus.ERROR:
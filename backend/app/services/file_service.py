@@ -2,8 +2,13 @@
 File processing service.
 """
 
+import asyncio
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Tuple
+
+import aiofiles
+import orjson
+from fastapi import UploadFile
 
 from ..models.agent import AgentConfig
 from ..models.message import MessageDataset
@@ -17,7 +22,94 @@ logger = get_logger()
 
 class FileService:
     """Service for file processing and validation."""
-    
+
+    # Chunk size for streaming uploads to disk (1 MB)
+    UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+    # Validated models keyed by file path; analysis and optimization both
+    # re-read the same uploaded files, so this skips the second parse and
+    # validation. The (mtime, size) signature invalidates on re-upload.
+    # Entries are whole parsed datasets — up to the 10 MB upload limit
+    # each, several times that once parsed — so the cap stays small: one
+    # session only ever needs its most recent config/dataset pair, plus
+    # a little slack for concurrently analyzed sessions.
+    _validated_cache: dict = {}
+    _VALIDATED_CACHE_MAX = 8
+
+    @staticmethod
+    async def _load_validated(file_path: Path, validate) -> Tuple[Any, bool]:
+        """Load and validate a JSON file, memoized on its stat signature.
+
+        Returns the validated model and whether it came from the cache.
+        """
+        stat = file_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(file_path)
+        cached = FileService._validated_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1], True
+
+        data = await FileUtils.load_json(file_path)
+        model = validate(data)
+        if len(FileService._validated_cache) >= FileService._VALIDATED_CACHE_MAX:
+            FileService._validated_cache.pop(next(iter(FileService._validated_cache)))
+        FileService._validated_cache[key] = (signature, model)
+        return model, False
+
+    @staticmethod
+    async def save_upload_streaming(
+        upload: UploadFile,
+        dest_path: Path,
+        max_size: int
+    ) -> int:
+        """Stream an uploaded file to disk chunk by chunk.
+
+        Bounds memory to one chunk instead of buffering the whole upload,
+        enforcing the size limit incrementally. Returns the total size in
+        bytes. The written file is validated as JSON after streaming.
+        """
+        try:
+            # Check file extension before touching disk
+            if not FileUtils.is_valid_json_file(upload.filename):
+                raise ValidationError(f"Invalid file type. Only JSON files are allowed: {upload.filename}")
+
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+
+            total_size = 0
+            first_chunk = True
+            async with aiofiles.open(dest_path, 'wb') as f:
+                while chunk := await upload.read(FileService.UPLOAD_CHUNK_SIZE):
+                    if first_chunk:
+                        # Fail fast on obviously non-JSON payloads before
+                        # streaming (and later parsing) the whole file
+                        if chunk.lstrip()[:1] not in (b'{', b'['):
+                            raise ValidationError(
+                                f"Invalid JSON content in file {upload.filename}: "
+                                "expected an object or array"
+                            )
+                        first_chunk = False
+                    total_size += len(chunk)
+                    # Enforce the size limit incrementally
+                    ValidationUtils.validate_file_size(total_size, max_size)
+                    await f.write(chunk)
+
+            # Validate JSON content from disk (single buffer, released immediately)
+            await FileUtils.load_json(dest_path)
+
+            logger.debug(f"Streamed upload to disk: {upload.filename} ({total_size} bytes)")
+            return total_size
+
+        except ValidationError:
+            # Remove the partially written file on validation failure
+            if dest_path.exists():
+                dest_path.unlink()
+            raise
+        except Exception as e:
+            if dest_path.exists():
+                dest_path.unlink()
+            logger.error(f"Failed to stream uploaded file {upload.filename}: {e}")
+            raise FileProcessingError(f"Failed to save uploaded file: {e}")
+
     @staticmethod
     async def process_session_files(
         session_dir: Path,
@@ -32,22 +124,29 @@ class FileService:
             agents_config_path = session_dir / agents_config_filename
             if not agents_config_path.exists():
                 raise FileProcessingError(f"Agents config file not found: {agents_config_path}")
-            
-            agents_config_data = await FileUtils.load_json(agents_config_path)
-            agents_config = ValidationUtils.validate_agents_config(agents_config_data)
-            logger.info(f"Agents config validated - {len(agents_config.agents)} agents found")
-            
-            # Load messages dataset file
+
+            # Check the messages dataset path up front, then load and
+            # validate both independent files concurrently
             messages_dataset_path = session_dir / messages_dataset_filename
             if not messages_dataset_path.exists():
                 raise FileProcessingError(f"Messages dataset file not found: {messages_dataset_path}")
-            
-            messages_dataset_data = await FileUtils.load_json(messages_dataset_path)
-            messages_dataset = ValidationUtils.validate_messages_dataset(messages_dataset_data)
+
+            (agents_config, agents_cached), (messages_dataset, messages_cached) = (
+                await asyncio.gather(
+                    FileService._load_validated(
+                        agents_config_path, ValidationUtils.validate_agents_config
+                    ),
+                    FileService._load_validated(
+                        messages_dataset_path, ValidationUtils.validate_messages_dataset
+                    )
+                )
+            )
+            logger.info(f"Agents config validated - {len(agents_config.agents)} agents found")
             logger.info(f"Messages dataset validated - {len(messages_dataset.messages)} messages found")
-            
-            # Cross-validate files
-            ValidationUtils.validate_session_files(agents_config, messages_dataset)
+
+            # Cross-validate files; a fully cached pair already passed this
+            if not (agents_cached and messages_cached):
+                ValidationUtils.validate_session_files(agents_config, messages_dataset)
             
             logger.info("Session files processed successfully")
             return agents_config, messages_dataset
@@ -75,14 +174,13 @@ class FileService:
             file_size = len(file_content)
             ValidationUtils.validate_file_size(file_size, max_size)
             
-            # Try to parse JSON content
+            # Try to parse JSON content; orjson takes the bytes directly,
+            # skipping the Python-level UTF-8 decode and validating
+            # encoding and syntax in one C pass
             try:
-                import json
-                json.loads(file_content.decode('utf-8'))
-            except json.JSONDecodeError as e:
+                orjson.loads(file_content)
+            except orjson.JSONDecodeError as e:
                 raise ValidationError(f"Invalid JSON content in file {filename}: {e}")
-            except UnicodeDecodeError as e:
-                raise ValidationError(f"Invalid file encoding in file {filename}: {e}")
             
             logger.debug(f"File validation passed: {filename}")
             
@@ -102,14 +200,26 @@ class FileService:
             "is_json": FileUtils.is_valid_json_file(filename)
         }
     
+    @staticmethod
+    def get_file_info_from_path(file_path: Path, filename: str) -> dict:
+        """Get file information for a file already saved on disk."""
+        size_bytes = FileUtils.get_file_size(file_path)
+        return {
+            "filename": filename,
+            "size_bytes": size_bytes,
+            "size_human": FileService._format_file_size(size_bytes),
+            "is_json": FileUtils.is_valid_json_file(filename)
+        }
+
+    # SI-ish unit buckets indexed by bit length (10 bits per step)
+    _SIZE_UNITS = ("B", "KB", "MB", "GB")
+
     @staticmethod
     def _format_file_size(size_bytes: int) -> str:
         """Format file size in human readable format."""
-        if size_bytes < 1024:
+        # bit_length picks the unit bucket directly, replacing the
+        # comparison ladder with one arithmetic step
+        i = min(3, max(0, (size_bytes.bit_length() - 1) // 10))
+        if i == 0:
             return f"{size_bytes} B"
-        elif size_bytes < 1024 * 1024:
-            return f"{size_bytes / 1024:.1f} KB"
-        elif size_bytes < 1024 * 1024 * 1024:
-            return f"{size_bytes / (1024 * 1024):.1f} MB"
-        else:
-            return f"{size_bytes / (1024 * 1024 * 1024):.1f} GB"
+        return f"{size_bytes / (1 << (10 * i)):.1f} {FileService._SIZE_UNITS[i]}"
@@ -2,44 +2,122 @@
 LLM service for calling OpenAI and Anthropic APIs using LangChain.
 """
 
-import json
+import asyncio
 import hashlib
+import time
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, Any, Optional
 
+import httpx
+import orjson
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from json_repair import repair_json
 
 from ..config import settings
 from ..utils.exceptions import LLMServiceError, ConfigurationError
 from ..utils.logger import get_logger
 from ..utils.cache import cache_manager
+from .rate_limiter import AsyncTokenBucket, estimate_tokens
 
 logger = get_logger()
 
 
+@lru_cache(maxsize=256)
+def _cache_key_for(
+    model: str,
+    base_url: str,
+    system_prompt: str,
+    prompt: str,
+    max_tokens: int,
+    temperature: float
+) -> str:
+    """Derive the cache key for an LLM request.
+
+    Retries and repeated analyses of one session hash identical prompts;
+    the LRU skips re-hashing them. blake2b is the fastest hash in
+    hashlib, and the NUL separators keep the key unambiguous.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in (
+        model,
+        base_url,
+        system_prompt,
+        prompt,
+        str(max_tokens),
+        str(temperature)
+    ):
+        hasher.update(part.encode())
+        hasher.update(b"\0")
+    return f"llm:{hasher.hexdigest()}"
+
+
 class LLMService:
     """Service for LLM API calls using LangChain."""
-    
+
+    # Upper bound on cached per-parameter clients; in practice only the
+    # evaluator and optimizer parameter pairs ever appear
+    _CLIENT_CACHE_MAX = 16
+
     def __init__(self):
         """Initialize LLM service."""
         self.openai_client = None
         
         if not settings.has_openai_key:
             raise ConfigurationError("No LLM API keys configured")
-        
+
+        # Shared pooled HTTP client: keepalive connections amortize the
+        # TCP + TLS handshake across LLM calls instead of paying it per call
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+
+        # Provider-enforced JSON mode cuts malformed responses (and the
+        # repair/retry work they trigger) at the source
+        self._extra_model_kwargs: Dict[str, Any] = {}
+        if settings.llm_force_json:
+            self._extra_model_kwargs["model_kwargs"] = {
+                "response_format": {"type": "json_object"}
+            }
+
         self.openai_client = ChatOpenAI(
             api_key=settings.openai_api_key,
             base_url=settings.openai_base_url,
             model=settings.openai_model,
             temperature=settings.temperature,
-            max_tokens=settings.max_tokens
+            max_tokens=settings.max_tokens,
+            http_async_client=self._http_client,
+            **self._extra_model_kwargs
         )
         logger.info("LLM service initialized")
+
+        # Clients for non-default (temperature, max_tokens) pairs; building
+        # a ChatOpenAI per call re-runs its whole model setup
+        self._client_cache: Dict[tuple, ChatOpenAI] = {}
         
         # Cache configuration
         self.use_cache = settings.use_llm_cache
         self.cache_ttl = settings.llm_cache_ttl
+
+        # Shared token bucket so concurrent evaluator/optimizer calls stay
+        # under provider RPM/TPM limits instead of triggering 429 retries
+        self._rate_limiter = AsyncTokenBucket(
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute
+        )
+
+        # Bound concurrent in-flight requests so parallel sessions saturate
+        # the provider without piling up timeouts behind its concurrency cap
+        self._concurrency: Optional[asyncio.Semaphore] = (
+            asyncio.Semaphore(settings.llm_max_concurrent_calls)
+            if settings.llm_max_concurrent_calls > 0 else None
+        )
+
+        # Exponential moving average of responses needing JSON repair;
+        # a persistently high rate means the prompts or provider JSON
+        # mode need attention, so surface it
+        self._json_repair_ema = 0.0
     
     async def call_llm(
         self, 
@@ -53,10 +131,12 @@ class LLMService:
         
         max_tokens = max_tokens or settings.max_tokens
         temperature = temperature or settings.temperature
-        
+
+        cache_mode = settings.llm_cache_mode.lower()
+
         # Check cache first
         cache_key = None
-        if self.use_cache and not skip_cache:
+        if self.use_cache and not skip_cache and cache_mode != "disabled":
             cache_key = self._generate_cache_key(
                 prompt=prompt,
                 system_prompt=system_prompt,
@@ -67,11 +147,38 @@ class LLMService:
             if cached_response:
                 logger.debug("Using cached LLM response")
                 return cached_response
+
+            # Fall back to the disk tier: entries written by earlier runs
+            # survive restarts, which is what makes cache warming (and the
+            # isolated mode below) useful across processes
+            if settings.llm_disk_cache:
+                cached_response = self._disk_cache_get(cache_key)
+                if cached_response is not None:
+                    logger.debug("Using disk-cached LLM response")
+                    cache_manager.set(cache_key, cached_response, self.cache_ttl)
+                    return cached_response
+
+        # Isolated mode never touches the network: it serves warmed cache
+        # entries so post-processing can be iterated on without API cost
+        if cache_mode == "isolated":
+            raise LLMServiceError("LLM cache miss in isolated cache mode")
         
         try:
+            # Respect provider rate limits before dispatching (cache hits
+            # above never reach this point)
+            await self._rate_limiter.acquire(
+                estimate_tokens((system_prompt or "") + prompt) + max_tokens
+            )
+
             # Call Model
             if self.openai_client:
-                response = await self._call_openai(prompt, system_prompt, max_tokens, temperature)
+                if self._concurrency is not None:
+                    async with self._concurrency:
+                        response = await self._call_openai(
+                            prompt, system_prompt, max_tokens, temperature
+                        )
+                else:
+                    response = await self._call_openai(prompt, system_prompt, max_tokens, temperature)
                 logger.info("LLM API call successful")
             else:
                 raise LLMServiceError("No LLM providers available")
@@ -79,6 +186,8 @@ class LLMService:
             # Cache the response if caching is enabled
             if self.use_cache and cache_key and not skip_cache:
                 cache_manager.set(cache_key, response, self.cache_ttl)
+                if settings.llm_disk_cache:
+                    self._disk_cache_put(cache_key, response)
             
             return response
         
@@ -101,16 +210,25 @@ class LLMService:
                 messages.append(SystemMessage(content=system_prompt))
             messages.append(HumanMessage(content=prompt))
             
-            # Use custom client if parameters differ
+            # Use custom client if parameters differ, built once per
+            # (temperature, max_tokens) pair and reused afterwards
             client = self.openai_client
             if max_tokens != settings.max_tokens or temperature != settings.temperature:
-                client = ChatOpenAI(
-                    api_key=settings.openai_api_key,
-                    base_url=settings.openai_base_url,
-                    model=settings.openai_model,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
+                key = (temperature, max_tokens)
+                client = self._client_cache.get(key)
+                if client is None:
+                    if len(self._client_cache) >= self._CLIENT_CACHE_MAX:
+                        self._client_cache.pop(next(iter(self._client_cache)))
+                    client = ChatOpenAI(
+                        api_key=settings.openai_api_key,
+                        base_url=settings.openai_base_url,
+                        model=settings.openai_model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        http_async_client=self._http_client,
+                        **self._extra_model_kwargs
+                    )
+                    self._client_cache[key] = client
             
             # Make API call
             logger.debug(f"Calling LLM API: {settings.openai_model}")
@@ -125,26 +243,50 @@ class LLMService:
             logger.error(f"LLM API call failed: {e}")
             raise LLMServiceError(f"LLM API call failed: {e}")
     
+    # EMA smoothing factor and the repair rate above which we warn
+    _REPAIR_EMA_ALPHA = 0.2
+    _REPAIR_RATE_WARN = 0.3
+
     async def parse_json_response(self, response: str) -> Dict[str, Any]:
         """Parse JSON response from LLM using json-repair for enhanced robustness."""
         try:
-            # First, try standard JSON parsing on the raw response
+            # First, try strict parsing on the raw response; orjson parses
+            # in C (and tolerates surrounding whitespace), so the common
+            # well-formed case costs microseconds even for 4000-token
+            # responses and a failure rejects almost as fast
             try:
-                result = json.loads(response.strip())
+                result = orjson.loads(response)
+                self._track_repair_rate(repaired=False)
                 logger.debug("JSON parsing successful")
                 return result
-                
-            except json.JSONDecodeError:
-                # If standard parsing fails, use json-repair directly on the original response
-                logger.debug("Standard JSON parsing failed, attempting repair")
+
+            except orjson.JSONDecodeError:
+                # If strict parsing fails, use json-repair directly on the
+                # original response. Imported lazily: most responses parse
+                # strictly, so worker startup need not pay for the library
+                logger.debug("Strict JSON parsing failed, attempting repair")
+                from json_repair import repair_json
                 repaired_json = repair_json(response)
-                result = json.loads(repaired_json)
+                result = orjson.loads(repaired_json)
+                self._track_repair_rate(repaired=True)
                 logger.debug("JSON parsing successful after repair")
                 return result
-                
+
         except Exception as e:
             logger.error(f"Failed to parse JSON response: {e}")
             raise LLMServiceError(f"Invalid JSON response from LLM: {e}")
+
+    def _track_repair_rate(self, repaired: bool) -> None:
+        """Update the repair-rate EMA and warn when it stays high."""
+        alpha = self._REPAIR_EMA_ALPHA
+        self._json_repair_ema = (
+            alpha * (1.0 if repaired else 0.0) + (1 - alpha) * self._json_repair_ema
+        )
+        if repaired and self._json_repair_ema > self._REPAIR_RATE_WARN:
+            logger.warning(
+                f"High JSON repair rate ({self._json_repair_ema:.0%}); "
+                "consider enabling LLM_FORCE_JSON"
+            )
     
     def _generate_cache_key(
         self,
@@ -154,22 +296,51 @@ class LLMService:
         temperature: Optional[float] = None
     ) -> str:
         """Generate a cache key for LLM request."""
-        # Create a dictionary of all parameters that affect the response
-        cache_data = {
-            "prompt": prompt,
-            "system_prompt": system_prompt,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "model": settings.openai_model
-        }
-        
-        # Convert to a stable string representation
-        cache_str = json.dumps(cache_data, sort_keys=True)
-        
-        # Generate hash
-        return f"llm:{hashlib.md5(cache_str.encode()).hexdigest()}"
+        return _cache_key_for(
+            settings.openai_model,
+            settings.openai_base_url or "",
+            system_prompt or "",
+            prompt,
+            max_tokens,
+            temperature
+        )
     
+    def _disk_cache_path(self, cache_key: str) -> Path:
+        """Map a cache key to its file in the on-disk cache directory."""
+        digest = cache_key.split(":", 1)[-1]
+        return settings.session_dir / "llm_cache" / f"{digest}.json"
+
+    def _disk_cache_get(self, cache_key: str) -> Optional[str]:
+        """Read a response from the disk cache tier, honoring the TTL."""
+        path = self._disk_cache_path(cache_key)
+        try:
+            entry = orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        if time.time() - entry.get("created_at", 0) > self.cache_ttl:
+            return None
+        return entry.get("response")
+
+    def _disk_cache_put(self, cache_key: str, response: str) -> None:
+        """Persist a response to the disk cache tier (best effort)."""
+        path = self._disk_cache_path(cache_key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(
+                orjson.dumps({"created_at": time.time(), "response": response})
+            )
+        except OSError as e:
+            logger.warning(f"Failed to persist LLM cache entry: {e}")
+
     def clear_cache(self) -> None:
         """Clear the LLM response cache."""
         cache_manager.clear()
+        cache_dir = settings.session_dir / "llm_cache"
+        if cache_dir.exists():
+            for entry in cache_dir.glob("*.json"):
+                entry.unlink(missing_ok=True)
         logger.info("LLM response cache cleared")
+
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        await self._http_client.aclose()
@@ -0,0 +1,88 @@
+"""
+Async token-bucket rate limiting for LLM API calls.
+"""
+
+import asyncio
+import time
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token-count proxy (~4 characters per token)."""
+    return len(text) // 4
+
+
+class AsyncTokenBucket:
+    """Token bucket throttling request and token throughput per minute.
+
+    Keeps concurrent callers under the provider's RPM/TPM limits so bursts
+    do not turn into 429 retries. A limit of 0 disables that dimension;
+    with both limits at 0 acquire() is a no-op.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """Initialize bucket with per-minute limits."""
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is configured."""
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    async def acquire(self, estimated_tokens: int = 0) -> None:
+        """Wait until one request (and its estimated tokens) may proceed."""
+        if not self.enabled:
+            return
+
+        # The lock also serializes waiters, so a burst drains in FIFO order
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.requests_per_minute and self._request_allowance < 1.0:
+                    wait = max(
+                        wait,
+                        (1.0 - self._request_allowance) * 60.0 / self.requests_per_minute
+                    )
+                if (
+                    self.tokens_per_minute
+                    and estimated_tokens
+                    and self._token_allowance < estimated_tokens
+                ):
+                    wait = max(
+                        wait,
+                        (estimated_tokens - self._token_allowance) * 60.0 / self.tokens_per_minute
+                    )
+                if wait <= 0:
+                    break
+                logger.debug(f"LLM rate limit reached, waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+
+            if self.requests_per_minute:
+                self._request_allowance -= 1.0
+            if self.tokens_per_minute:
+                self._token_allowance -= estimated_tokens
+
+    def _refill(self) -> None:
+        """Replenish allowances according to elapsed time."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                float(self.requests_per_minute),
+                self._request_allowance + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed * self.tokens_per_minute / 60.0
+            )
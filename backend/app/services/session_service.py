@@ -2,28 +2,135 @@
 Session management service.
 """
 
-import json
+import asyncio
+import heapq
+import os
+import shutil
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple
+
+import orjson
+from fastapi import UploadFile
 
 from ..config import settings
 from ..models.session import Session, SessionStatus
+from ..utils.cache import cache_manager
 from ..utils.file_utils import FileUtils
-from ..utils.exceptions import SessionNotFoundError, FileProcessingError
+from ..utils.time_utils import utc_now
+from ..utils.exceptions import SessionNotFoundError, FileProcessingError, ValidationError
 from ..utils.logger import get_logger
+from .file_service import FileService
 
 logger = get_logger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _session_paths(base_dir: str, session_id: str) -> Tuple[Path, Path, Path]:
+    """Per-session (directory, session.json, session.wal) paths.
+
+    Path joining re-normalizes separators on every call and the same
+    three paths are rebuilt throughout a session's lifecycle, so they
+    are constructed once and memoized by session id.
+    """
+    session_dir = Path(base_dir) / session_id
+    return session_dir, session_dir / "session.json", session_dir / "session.wal"
+
+
 class SessionService:
     """Service for managing analysis sessions."""
     
     def __init__(self):
         """Initialize session service."""
         self.session_dir = settings.session_dir
-        self.session_dir.mkdir(parents=True, exist_ok=True)
+        settings.ensure_directories()
+        # mtime-validated cache of parsed session files, so listing
+        # endpoints do not re-parse sessions that have not changed
+        self._session_file_cache: Dict[str, tuple] = {}
+        # Write-ahead log state: updates append a compact WAL line and a
+        # debounced background task checkpoints session.json afterwards
+        self._pending_sessions: Dict[str, Session] = {}
+        self._checkpoint_tasks: Dict[str, asyncio.Task] = {}
+        # In-memory index of all sessions, built lazily from one directory
+        # scan and kept current by create/update/delete; listing and
+        # statistics read from it instead of re-scanning the directory
+        self._session_index: Optional[Dict[str, Session]] = None
+        self._index_lock = asyncio.Lock()
+
+    # Delay before a WAL append is checkpointed into session.json, so
+    # bursts of status updates coalesce into a single pretty-print write
+    WAL_CHECKPOINT_DELAY = 0.1
+
+    # Concurrent session.json loads while building the session index
+    INDEX_LOAD_CONCURRENCY = 64
+
+    # Upper bound on mtime-validated parsed session files kept in memory
+    _SESSION_FILE_CACHE_MAX = 1024
+
+    # Sort keys accepted by list_sessions
+    _SORT_KEYS = {
+        "created_at": lambda s: s.created_at,
+        "updated_at": lambda s: s.updated_at,
+        "status": lambda s: s.status.value,
+    }
     
+    async def create_session_from_uploads(
+        self,
+        agents_config: UploadFile,
+        messages_dataset: UploadFile
+    ) -> Session:
+        """Create a new session by streaming uploaded files to disk.
+
+        Unlike create_session, this never holds a full upload in memory:
+        files are written chunk by chunk and validated from disk.
+        """
+        session_id = FileUtils.generate_session_id()
+        session = Session(session_id=session_id)
+
+        # save_upload_streaming creates input/ (and the session root via
+        # parents=True) itself, so no separate mkdir is needed here
+        session_path = self.get_session_path(session_id)
+        input_dir = session_path / "input"
+
+        try:
+            await FileService.save_upload_streaming(
+                agents_config, input_dir / "agents_config.json", settings.max_file_size
+            )
+            await FileService.save_upload_streaming(
+                messages_dataset, input_dir / "messages_dataset.json", settings.max_file_size
+            )
+
+            # Update session
+            session.agents_config_filename = "input/agents_config.json"
+            session.messages_dataset_filename = "input/messages_dataset.json"
+            session.status = SessionStatus.UPLOADED
+            session.original_filenames = {
+                "agents_config": agents_config.filename,
+                "messages_dataset": messages_dataset.filename
+            }
+
+            # Save session metadata
+            await self._save_session(session)
+
+            logger.info(f"Created new session with streamed uploads: {session_id}")
+            return session
+
+        except ValidationError:
+            # Clean up session directory and surface the validation failure
+            await self._cleanup_session_dir(session_id)
+            raise
+        except Exception as e:
+            logger.error(f"Failed to create session with streamed uploads: {e}")
+            await self._cleanup_session_dir(session_id)
+            raise FileProcessingError(f"Failed to create session: {e}")
+
+    async def _cleanup_session_dir(self, session_id: str) -> None:
+        """Best-effort removal of a session directory after a failed create."""
+        try:
+            await self.delete_session(session_id)
+        except Exception as cleanup_error:
+            logger.warning(f"Failed to clean up session {session_id}: {cleanup_error}")
+
     async def create_session(
         self,
         agents_config_content: bytes,
@@ -39,19 +146,21 @@ class SessionService:
             session_id=session_id
         )
         
-        # Create session directory
-        session_path = await FileUtils.ensure_session_dir(session_id, self.session_dir)
-        
+        session_path = self.get_session_path(session_id)
+
         try:
-            # Save agents config file
-            agents_config_path = session_path / "input"
-            agents_config_path.mkdir(parents=True, exist_ok=True)
-            agents_config_file = agents_config_path / "agents_config.json"
-            await FileUtils.save_bytes_to_file(agents_config_content, agents_config_file)
-            
-            # Save messages dataset file
-            messages_dataset_file = agents_config_path / "messages_dataset.json"
-            await FileUtils.save_bytes_to_file(messages_dataset_content, messages_dataset_file)
+            # One mkdir with parents=True creates the session root and
+            # input/ together; the two independent writes then overlap
+            input_dir = session_path / "input"
+            input_dir.mkdir(parents=True, exist_ok=True)
+            await asyncio.gather(
+                FileUtils.save_bytes_to_file(
+                    agents_config_content, input_dir / "agents_config.json"
+                ),
+                FileUtils.save_bytes_to_file(
+                    messages_dataset_content, input_dir / "messages_dataset.json"
+                )
+            )
             
             # Update session
             session.agents_config_filename = "input/agents_config.json"
@@ -76,15 +185,27 @@ class SessionService:
     
     async def get_session(self, session_id: str) -> Session:
         """Get session by ID."""
+        # Serve repeated lookups from the TTL cache to skip disk I/O
+        cached_session = cache_manager.get(self._session_cache_key(session_id))
+        if cached_session is not None:
+            return cached_session
+
         session_file = self._get_session_file_path(session_id)
-        
+
         if not session_file.exists():
             raise SessionNotFoundError(f"Session not found: {session_id}")
-        
+
         try:
-            session_data = await FileUtils.load_json(session_file)
-            session = Session(**session_data)
-            logger.debug(f"Retrieved session: {session_id}")
+            # Replay the WAL if it holds updates newer than the checkpoint
+            # (e.g. after a crash before the background flush ran)
+            session = self._replay_wal(session_id, session_file)
+            if session is None:
+                session_data = await FileUtils.load_json(session_file)
+                session = Session(**session_data)
+            cache_manager.set(
+                self._session_cache_key(session_id), session, settings.session_cache_ttl
+            )
+            logger.debug("Retrieved session: %s", session_id)
             return session
         except Exception as e:
             logger.error(f"Failed to load session {session_id}: {e}")
@@ -92,25 +213,51 @@ class SessionService:
     
     async def update_session(self, session: Session) -> Session:
         """Update session."""
-        session.updated_at = datetime.utcnow()
+        session.updated_at = utc_now()
+        await self._save_session(session)
+        logger.debug("Updated session: %s", session.session_id)
+        return session
+
+    async def patch_session(self, session_id: str, **fields: Any) -> Session:
+        """Apply field updates to a session and persist them.
+
+        Spares callers that only hold a session id the explicit
+        load-mutate-save dance: the load is served from the cache or
+        index when warm, and persistence goes through the WAL append
+        path, so a status flip costs one compact JSON line rather than
+        a full re-encode.
+        """
+        session = await self.get_session(session_id)
+        for name, value in fields.items():
+            setattr(session, name, value)
+        session.updated_at = utc_now()
         await self._save_session(session)
-        logger.debug(f"Updated session: {session.session_id}")
+        logger.debug("Patched session: %s", session_id)
         return session
     
     async def delete_session(self, session_id: str) -> bool:
         """Delete session and all associated files."""
         try:
-            session_dir = FileUtils.get_session_dir(session_id, self.session_dir)
+            cache_manager.delete(self._session_cache_key(session_id))
+            # Drop any queued WAL checkpoint so it cannot resurrect the
+            # session files after deletion
+            self._pending_sessions.pop(session_id, None)
+            checkpoint_task = self._checkpoint_tasks.pop(session_id, None)
+            if checkpoint_task is not None and not checkpoint_task.done():
+                checkpoint_task.cancel()
+            session_dir = self.get_session_path(session_id)
+            self._session_file_cache.pop(str(session_dir / "session.json"), None)
+            if self._session_index is not None:
+                self._session_index.pop(session_id, None)
             
             if session_dir.exists():
-                # Remove all files in session directory
-                for file_path in session_dir.rglob("*"):
-                    if file_path.is_file():
-                        file_path.unlink()
-                
-                # Remove directory
-                session_dir.rmdir()
-                
+                # One recursive C-level removal instead of an rglob walk
+                # (which stats every entry) plus per-file unlinks; this
+                # also handles the nested input/ directory that made the
+                # final rmdir fail. Run in a thread so the many blocking
+                # unlinks of a large session never stall the event loop
+                await asyncio.to_thread(shutil.rmtree, session_dir)
+
                 logger.info(f"Deleted session: {session_id}")
                 return True
             else:
@@ -132,21 +279,9 @@ class SessionService:
         simple_format: bool = False
     ) -> Dict[str, Any]:
         """List sessions with filtering, searching, and pagination."""
-        sessions = []
-        
         try:
-            # Load all sessions
-            for session_dir in self.session_dir.iterdir():
-                if session_dir.is_dir():
-                    session_file = session_dir / "session.json"
-                    if session_file.exists():
-                        try:
-                            session_data = await FileUtils.load_json(session_file)
-                            session = Session(**session_data)
-                            sessions.append(session)
-                        except Exception as e:
-                            logger.warning(f"Failed to load session from {session_dir}: {e}")
-            
+            sessions = list((await self._get_session_index()).values())
+
             # Apply filters
             filtered_sessions = sessions
             
@@ -154,30 +289,31 @@ class SessionService:
             if status_filter:
                 filtered_sessions = [s for s in filtered_sessions if s.status.value == status_filter]
             
-            # Search query filter
+            # Search query filter: one containment check against each
+            # session's cached lowercase blob
             if search_query:
                 query_lower = search_query.lower()
                 filtered_sessions = [
-                    s for s in filtered_sessions 
-                    if (query_lower in s.session_id.lower() or
-                        (s.original_filenames and any(
-                            query_lower in filename.lower() 
-                            for filename in s.original_filenames.values()
-                        )) or
-                        (s.error_message and query_lower in s.error_message.lower()))
+                    s for s in filtered_sessions if query_lower in s.search_blob
                 ]
             
+            # Pagination bookkeeping happens before sorting so bounded
+            # selection below can drop everything past the requested page
+            total_count = len(filtered_sessions)
+
             # Sort sessions
             reverse_order = sort_order.lower() == "desc"
-            if sort_by == "created_at":
-                filtered_sessions.sort(key=lambda s: s.created_at, reverse=reverse_order)
-            elif sort_by == "updated_at":
-                filtered_sessions.sort(key=lambda s: s.updated_at, reverse=reverse_order)
-            elif sort_by == "status":
-                filtered_sessions.sort(key=lambda s: s.status.value, reverse=reverse_order)
-            
-            # Calculate pagination
-            total_count = len(filtered_sessions)
+            key_fn = self._SORT_KEYS.get(sort_by)
+            if key_fn is not None:
+                bound = offset + limit
+                if limit > 0 and bound * 4 < total_count:
+                    # Only the first bound entries are ever returned, so a
+                    # bounded heap selection (O(N log k)) beats sorting the
+                    # whole list (O(N log N)) for small pages
+                    select = heapq.nlargest if reverse_order else heapq.nsmallest
+                    filtered_sessions = select(bound, filtered_sessions, key=key_fn)
+                else:
+                    filtered_sessions.sort(key=key_fn, reverse=reverse_order)
             total_pages = (total_count + limit - 1) // limit if limit > 0 else 1
             current_page = (offset // limit) + 1 if limit > 0 else 1
             
@@ -218,42 +354,38 @@ class SessionService:
     async def get_session_statistics(self) -> Dict[str, Any]:
         """Get session statistics."""
         try:
-            sessions = []
-            for session_dir in self.session_dir.iterdir():
-                if session_dir.is_dir():
-                    session_file = session_dir / "session.json"
-                    if session_file.exists():
-                        try:
-                            session_data = await FileUtils.load_json(session_file)
-                            session = Session(**session_data)
-                            sessions.append(session)
-                        except Exception as e:
-                            logger.warning(f"Failed to load session from {session_dir}: {e}")
-            
-            # Calculate statistics
+            sessions = (await self._get_session_index()).values()
+
+            # All counters come out of one pass over the in-memory index
+            from datetime import timedelta
+            seven_days_ago = utc_now() - timedelta(days=7)
+
             total_sessions = len(sessions)
-            status_counts = {}
-            
+            status_counts: Dict[str, int] = {}
+            recent_count = 0
+            has_analysis_count = 0
+            has_optimization_count = 0
             for session in sessions:
                 status = session.status.value
                 status_counts[status] = status_counts.get(status, 0) + 1
-            
+                if session.created_at >= seven_days_ago:
+                    recent_count += 1
+                if session.has_analysis():
+                    has_analysis_count += 1
+                if session.has_optimization():
+                    has_optimization_count += 1
+
             # Calculate success rate
             completed_sessions = status_counts.get("completed", 0)
             success_rate = (completed_sessions / total_sessions * 100) if total_sessions > 0 else 0
-            
-            # Recent activity (last 7 days)
-            from datetime import datetime, timedelta
-            seven_days_ago = datetime.utcnow() - timedelta(days=7)
-            recent_sessions = [s for s in sessions if s.created_at >= seven_days_ago]
-            
+
             stats = {
                 "total_sessions": total_sessions,
                 "status_counts": status_counts,
                 "success_rate": round(success_rate, 1),
-                "recent_sessions_count": len(recent_sessions),
-                "has_analysis_count": len([s for s in sessions if s.has_analysis()]),
-                "has_optimization_count": len([s for s in sessions if s.has_optimization()])
+                "recent_sessions_count": recent_count,
+                "has_analysis_count": has_analysis_count,
+                "has_optimization_count": has_optimization_count
             }
             
             logger.info(f"Generated session statistics: {stats}")
@@ -270,33 +402,207 @@ class SessionService:
             "failed": [],
             "total": len(session_ids)
         }
-        
-        for session_id in session_ids:
+
+        async def delete_one(session_id: str):
             try:
-                success = await self.delete_session(session_id)
-                if success:
-                    results["deleted"].append(session_id)
-                else:
-                    results["failed"].append({"session_id": session_id, "error": "Session not found"})
+                return session_id, await self.delete_session(session_id), None
             except Exception as e:
-                results["failed"].append({"session_id": session_id, "error": str(e)})
-        
+                return session_id, False, str(e)
+
+        # Deletes are independent and I/O-bound, so run them concurrently;
+        # gather preserves input order in the results
+        outcomes = await asyncio.gather(*(delete_one(sid) for sid in session_ids))
+        for session_id, success, error in outcomes:
+            if success:
+                results["deleted"].append(session_id)
+            else:
+                results["failed"].append(
+                    {"session_id": session_id, "error": error or "Session not found"}
+                )
+
         logger.info(f"Bulk delete completed: {len(results['deleted'])} deleted, {len(results['failed'])} failed")
         return results
     
+    def get_session_path(self, session_id: str) -> Path:
+        """Get the directory for a session."""
+        return _session_paths(str(self.session_dir), session_id)[0]
+
     async def get_session_file_path(self, session_id: str, filename: str) -> Path:
         """Get path to session file."""
-        session_dir = FileUtils.get_session_dir(session_id, self.session_dir)
-        return session_dir / filename
+        return self.get_session_path(session_id) / filename
     
     def _get_session_file_path(self, session_id: str) -> Path:
         """Get path to session metadata file."""
-        session_dir = FileUtils.get_session_dir(session_id, self.session_dir)
-        return session_dir / "session.json"
+        return _session_paths(str(self.session_dir), session_id)[1]
     
+    async def _get_session_index(self) -> Dict[str, Session]:
+        """Return the in-memory session index, building it on first use.
+
+        The one-time directory scan replaces the per-request scan that
+        listing and statistics used to do; afterwards every mutation
+        keeps the index current, so those endpoints never touch disk.
+        """
+        if self._session_index is None:
+            async with self._index_lock:
+                if self._session_index is None:
+                    # scandir reuses the directory entry's cached stat, so
+                    # the type check costs no extra syscall; missing
+                    # session.json surfaces as FileNotFoundError on load
+                    # instead of a separate exists() probe per directory
+                    with os.scandir(self.session_dir) as entries:
+                        session_files = [
+                            Path(entry.path) / "session.json"
+                            for entry in entries
+                            if entry.is_dir(follow_symlinks=False)
+                        ]
+                    # Load concurrently: the scan is I/O-bound, so the
+                    # build costs max(latency) instead of sum(latency).
+                    # The semaphore caps open file descriptors.
+                    semaphore = asyncio.Semaphore(self.INDEX_LOAD_CONCURRENCY)
+
+                    async def load_one(session_file: Path) -> Optional[Session]:
+                        async with semaphore:
+                            try:
+                                # Same crash recovery as get_session: an
+                                # un-checkpointed WAL entry is newer than
+                                # session.json and must win
+                                session = self._replay_wal(
+                                    session_file.parent.name, session_file
+                                )
+                                if session is None:
+                                    session = await self._load_session_file(session_file)
+                                return session
+                            except FileNotFoundError:
+                                # Directory without session metadata
+                                # (e.g. a create in progress)
+                                return None
+                            except Exception as e:
+                                logger.warning(f"Failed to load session from {session_file.parent}: {e}")
+                                return None
+
+                    loaded = await asyncio.gather(*(load_one(f) for f in session_files))
+                    index = {
+                        session.session_id: session for session in loaded if session is not None
+                    }
+                    # Updates that raced the build (saved while the index
+                    # was still None, so with no write-through target) are
+                    # queued for checkpoint; overlay them, they are newer
+                    # than anything read from disk
+                    index.update(self._pending_sessions)
+                    self._session_index = index
+        return self._session_index
+
+    async def _load_session_file(self, session_file: Path) -> Session:
+        """Load a session file, reusing the parsed model while unchanged."""
+        cache_key = str(session_file)
+        mtime = session_file.stat().st_mtime_ns
+        cached = self._session_file_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        session_data = await FileUtils.load_json(session_file)
+        session = Session(**session_data)
+        if len(self._session_file_cache) >= self._SESSION_FILE_CACHE_MAX:
+            self._session_file_cache.pop(next(iter(self._session_file_cache)))
+        self._session_file_cache[cache_key] = (mtime, session)
+        return session
+
+    @staticmethod
+    def _session_cache_key(session_id: str) -> str:
+        """Cache key for a session object."""
+        return f"session:{session_id}"
+
+    def _get_wal_file_path(self, session_id: str) -> Path:
+        """Get path to the session write-ahead log file."""
+        return _session_paths(str(self.session_dir), session_id)[2]
+
+    def _replay_wal(self, session_id: str, session_file: Path) -> Optional[Session]:
+        """Return the session from the last WAL entry if it is newer than
+        the checkpointed session.json, else None."""
+        wal_file = self._get_wal_file_path(session_id)
+        try:
+            if not wal_file.exists():
+                return None
+            if wal_file.stat().st_mtime_ns < session_file.stat().st_mtime_ns:
+                return None
+            lines = [line for line in wal_file.read_bytes().splitlines() if line.strip()]
+            if not lines:
+                return None
+            return Session(**orjson.loads(lines[-1]))
+        except Exception as e:
+            logger.warning(f"Failed to replay session WAL for {session_id}: {e}")
+            return None
+
     async def _save_session(self, session: Session) -> None:
-        """Save session metadata to file."""
+        """Save session metadata.
+
+        The first save of a session writes session.json synchronously so
+        new sessions are immediately visible to directory scans. Later
+        updates append a compact snapshot to a per-session WAL and let a
+        debounced background task checkpoint session.json, so the burst
+        of status updates during analysis costs one append each instead
+        of a full rewrite.
+        """
         session_file = self._get_session_file_path(session.session_id)
-        # Convert to dict and handle datetime serialization
-        session_data = session.model_dump()
-        await FileUtils.save_json(session_data, session_file)
+
+        # Write through to the cache and index so reads stay consistent
+        cache_manager.set(
+            self._session_cache_key(session.session_id), session, settings.session_cache_ttl
+        )
+        if self._session_index is not None:
+            self._session_index[session.session_id] = session
+
+        if not session_file.exists():
+            await FileUtils.save_json(session.model_dump(), session_file)
+            return
+
+        await FileUtils.append_json_line(session.model_dump(), self._get_wal_file_path(session.session_id))
+        self._schedule_checkpoint(session)
+
+    def _schedule_checkpoint(self, session: Session) -> None:
+        """Schedule a debounced checkpoint of the session to session.json."""
+        session_id = session.session_id
+        self._pending_sessions[session_id] = session
+        task = self._checkpoint_tasks.get(session_id)
+        if task is None or task.done():
+            self._checkpoint_tasks[session_id] = asyncio.create_task(
+                self._checkpoint_session(session_id)
+            )
+
+    async def _checkpoint_session(self, session_id: str) -> None:
+        """Flush the latest pending snapshot of a session to session.json."""
+        try:
+            await asyncio.sleep(self.WAL_CHECKPOINT_DELAY)
+            session = self._pending_sessions.pop(session_id, None)
+            if session is None:
+                return
+            session_file = self._get_session_file_path(session_id)
+            await FileUtils.save_json(session.model_dump(), session_file)
+            # The WAL is superseded by the checkpoint
+            wal_file = self._get_wal_file_path(session_id)
+            if wal_file.exists():
+                wal_file.unlink()
+        except Exception as e:
+            logger.error(f"Failed to checkpoint session {session_id}: {e}")
+        finally:
+            self._checkpoint_tasks.pop(session_id, None)
+            # A save may have arrived while checkpointing; pick it up
+            if session_id in self._pending_sessions:
+                self._schedule_checkpoint(self._pending_sessions[session_id])
+
+    async def flush_pending_sessions(self) -> None:
+        """Checkpoint all pending sessions immediately (used at shutdown)."""
+        for session_id, session in list(self._pending_sessions.items()):
+            self._pending_sessions.pop(session_id, None)
+            task = self._checkpoint_tasks.pop(session_id, None)
+            if task is not None and not task.done():
+                task.cancel()
+            try:
+                await FileUtils.save_json(
+                    session.model_dump(), self._get_session_file_path(session_id)
+                )
+                wal_file = self._get_wal_file_path(session_id)
+                if wal_file.exists():
+                    wal_file.unlink()
+            except Exception as e:
+                logger.error(f"Failed to flush session {session_id}: {e}")
@@ -2,8 +2,11 @@
 Simple in-memory cache manager.
 """
 
+import asyncio
+import random
+import sys
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from threading import Lock
 
 from .logger import get_logger
@@ -13,93 +16,141 @@ logger = get_logger()
 
 class CacheManager:
     """Simple in-memory cache with TTL support."""
-    
+
+    # Number of lock shards; mutations on different shards never contend
+    SHARD_COUNT = 16
+
     def __init__(self, default_ttl: int = 3600):
         """Initialize cache manager.
-        
+
         Args:
             default_ttl: Default time-to-live in seconds
         """
         self.default_ttl = default_ttl
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = Lock()
-    
+        # Sharded storage: each shard pairs its own dict with its own
+        # lock, so concurrent writers only serialize within a shard
+        self._shards: List[Tuple[Dict[str, Dict[str, Any]], Lock]] = [
+            ({}, Lock()) for _ in range(self.SHARD_COUNT)
+        ]
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    # How often the background sweep evicts expired entries
+    SWEEP_INTERVAL = 60.0
+
+    def _shard(self, key: str) -> Tuple[Dict[str, Dict[str, Any]], Lock]:
+        """Pick the shard responsible for a key."""
+        return self._shards[hash(key) & (self.SHARD_COUNT - 1)]
+
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
-        with self._lock:
-            if key not in self._cache:
-                return None
-            
-            entry = self._cache[key]
-            
-            # Check if expired
-            if time.time() > entry["expires_at"]:
-                del self._cache[key]
-                return None
-            
-            return entry["value"]
-    
+        # Lock-free read: a single dict lookup is atomic under the GIL,
+        # and expired entries are left for the background sweep rather
+        # than deleted here, so concurrent readers never serialize
+        entry = self._shard(key)[0].get(key)
+        if entry is None or time.time() > entry["expires_at"]:
+            return None
+        return entry["value"]
+
+    def start_sweeper(self) -> None:
+        """Start the background task that evicts expired entries."""
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    def stop_sweeper(self) -> None:
+        """Cancel the background expiry sweep."""
+        if self._sweep_task is not None and not self._sweep_task.done():
+            self._sweep_task.cancel()
+        self._sweep_task = None
+
+    async def _sweep_loop(self) -> None:
+        """Periodically evict expired entries off the request path."""
+        while True:
+            await asyncio.sleep(self.SWEEP_INTERVAL)
+            self.cleanup_expired()
+
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache."""
         ttl = ttl or self.default_ttl
         expires_at = time.time() + ttl
-        
-        with self._lock:
-            self._cache[key] = {
+
+        cache, lock = self._shard(key)
+        with lock:
+            cache[key] = {
                 "value": value,
                 "expires_at": expires_at,
                 "created_at": time.time()
             }
-    
+
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
+        cache, lock = self._shard(key)
+        with lock:
+            if key in cache:
+                del cache[key]
                 return True
             return False
-    
+
     def clear(self) -> None:
         """Clear all cache entries."""
-        with self._lock:
-            count = len(self._cache)
-            self._cache.clear()
-            logger.info(f"Cache cleared: {count} entries removed")
-    
+        count = 0
+        for cache, lock in self._shards:
+            with lock:
+                count += len(cache)
+                cache.clear()
+        logger.info(f"Cache cleared: {count} entries removed")
+
     def cleanup_expired(self) -> int:
         """Remove expired entries and return count."""
         current_time = time.time()
-        expired_keys = []
-        
-        with self._lock:
-            for key, entry in self._cache.items():
-                if current_time > entry["expires_at"]:
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                del self._cache[key]
-        
-        if expired_keys:
-            logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
-        
-        return len(expired_keys)
-    
+        expired_count = 0
+
+        for cache, lock in self._shards:
+            with lock:
+                expired_keys = [
+                    key for key, entry in cache.items()
+                    if current_time > entry["expires_at"]
+                ]
+                for key in expired_keys:
+                    del cache[key]
+                expired_count += len(expired_keys)
+
+        if expired_count:
+            logger.info(f"Cleaned up {expired_count} expired cache entries")
+
+        return expired_count
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        with self._lock:
-            current_time = time.time()
-            total_entries = len(self._cache)
-            expired_entries = sum(
-                1 for entry in self._cache.values() 
-                if current_time > entry["expires_at"]
+        current_time = time.time()
+        total_entries = 0
+        expired_entries = 0
+        sampled: List[Dict[str, Any]] = []
+
+        for cache, lock in self._shards:
+            with lock:
+                entries = list(cache.values())
+            total_entries += len(entries)
+            expired_entries += sum(
+                1 for entry in entries if current_time > entry["expires_at"]
             )
-            
-            return {
-                "total_entries": total_entries,
-                "active_entries": total_entries - expired_entries,
-                "expired_entries": expired_entries,
-                "memory_usage_estimate": len(str(self._cache))  # Rough estimate
-            }
+            sampled.extend(entries)
+
+        # Shallow sampled estimate: stringifying the whole cache for
+        # len(str(...)) allocated a copy of every payload per stats
+        # call; sizing a small sample and extrapolating is O(1)
+        if total_entries:
+            sample = random.sample(sampled, min(32, total_entries))
+            avg_size = sum(sys.getsizeof(e["value"]) for e in sample) / len(sample)
+            memory_estimate = int(avg_size * total_entries)
+        else:
+            memory_estimate = 0
+
+        return {
+            "total_entries": total_entries,
+            "active_entries": total_entries - expired_entries,
+            "expired_entries": expired_entries,
+            "memory_usage_estimate": memory_estimate
+        }
 
 
 # Global cache instance
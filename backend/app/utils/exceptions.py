@@ -7,82 +7,77 @@ from typing import Optional, Dict, Any
 
 class ContextOptimizerException(Exception):
     """Base exception for ContextOptimizer application."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None, error_code: str = "generic_error"):
+
+    # Subclasses declare their code in the class statement; instances
+    # fall back to this class attribute unless one is passed explicitly
+    error_code: str = "generic_error"
+
+    def __init_subclass__(cls, *, error_code: Optional[str] = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if error_code is not None:
+            cls.error_code = error_code
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None, error_code: Optional[str] = None):
         super().__init__(message)
         self.message = message
         self.details = details or {}
-        self.error_code = error_code
-    
+        if error_code is not None:
+            self.error_code = error_code
+        self._payload: Optional[Dict[str, Any]] = None
+
     def __str__(self):
         return self.message
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the exception for API error responses.
+
+        Exceptions are not mutated after construction, so the payload is
+        built once and reused on repeated serializations.
+        """
+        if self._payload is None:
+            self._payload = {
+                "error": self.error_code,
+                "message": self.message,
+                "details": self.details
+            }
+        return self._payload
+
 
-class ValidationError(ContextOptimizerException):
+class ValidationError(ContextOptimizerException, error_code="validation_error"):
     """Exception raised for data validation errors."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "validation_error")
 
 
-class FileProcessingError(ContextOptimizerException):
+class FileProcessingError(ContextOptimizerException, error_code="file_processing_error"):
     """Exception raised for file processing errors."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "file_processing_error")
 
 
-class LLMServiceError(ContextOptimizerException):
+class LLMServiceError(ContextOptimizerException, error_code="llm_service_error"):
     """Exception raised for LLM service errors."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "llm_service_error")
 
 
-class SessionNotFoundError(ContextOptimizerException):
+class SessionNotFoundError(ContextOptimizerException, error_code="session_not_found"):
     """Exception raised when a session is not found."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "session_not_found")
 
 
-class ConfigurationError(ContextOptimizerException):
+class ConfigurationError(ContextOptimizerException, error_code="configuration_error"):
     """Exception raised for configuration errors."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "configuration_error")
 
 
-class RateLimitError(ContextOptimizerException):
+class RateLimitError(ContextOptimizerException, error_code="rate_limit_error"):
     """Exception raised when rate limit is exceeded."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "rate_limit_error")
 
 
-class DataConsistencyError(ContextOptimizerException):
+class DataConsistencyError(ContextOptimizerException, error_code="data_consistency_error"):
     """Exception raised for data consistency issues."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "data_consistency_error")
 
 
-class AnalysisError(ContextOptimizerException):
+class AnalysisError(ContextOptimizerException, error_code="analysis_error"):
     """Exception raised for analysis errors."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "analysis_error")
 
 
-class OptimizationError(ContextOptimizerException):
+class OptimizationError(ContextOptimizerException, error_code="optimization_error"):
     """Exception raised for optimization errors."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "optimization_error")
 
 
-class TimeoutError(ContextOptimizerException):
+class TimeoutError(ContextOptimizerException, error_code="timeout_error"):
     """Exception raised when an operation times out."""
-    
-    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
-        super().__init__(message, details, "timeout_error")
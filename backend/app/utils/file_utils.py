@@ -2,13 +2,14 @@
 File handling utilities.
 """
 
-import json
+import mmap
 import uuid
-from datetime import datetime
+from enum import Enum
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 import aiofiles
+import orjson
 
 from .exceptions import FileProcessingError, ValidationError
 from .logger import get_logger
@@ -16,13 +17,13 @@ from .logger import get_logger
 logger = get_logger(__name__)
 
 
-class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder for datetime objects."""
-    
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+def _orjson_default(obj: Any) -> Any:
+    """Fallback serializer for types orjson does not handle natively."""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 
 class FileUtils:
@@ -33,33 +34,72 @@ class FileUtils:
         """Save data as JSON file."""
         try:
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(data, indent=2, ensure_ascii=False, cls=DateTimeEncoder))
+            # orjson serializes datetimes natively and writes UTF-8 bytes
+            # directly, avoiding the str round-trip of json.dumps
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2, default=_orjson_default)
+            if len(content) <= FileUtils.SMALL_READ_THRESHOLD:
+                # Mirror load_json: for small payloads (session.json etc.)
+                # one write syscall is cheaper than an aiofiles round trip
+                file_path.write_bytes(content)
+            else:
+                async with aiofiles.open(file_path, 'wb') as f:
+                    await f.write(content)
             logger.info(f"Saved JSON file: {file_path}")
         except Exception as e:
             logger.error(f"Failed to save JSON file {file_path}: {e}")
             raise FileProcessingError(f"Failed to save JSON file: {e}")
     
+    # Files below this size are read synchronously: a single read syscall
+    # costs far less than a round-trip through the aiofiles thread pool
+    SMALL_READ_THRESHOLD = 64 * 1024  # 64KB
+
+    # Files above this size are parsed through mmap instead of read()
+    MMAP_THRESHOLD = 1024 * 1024  # 1MB
+
     @staticmethod
     async def load_json(file_path: Path) -> Dict[str, Any]:
         """Load JSON file."""
         try:
             if not file_path.exists():
                 raise FileNotFoundError(f"File not found: {file_path}")
-            
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                data = json.loads(content)
-            
+
+            file_size = file_path.stat().st_size
+            if file_size >= FileUtils.MMAP_THRESHOLD:
+                # Memory-map large files so the parser reads the page cache
+                # directly instead of copying the whole file into a bytes object
+                with open(file_path, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        data = orjson.loads(memoryview(mm))
+            elif file_size <= FileUtils.SMALL_READ_THRESHOLD:
+                # Small metadata files (session.json etc.) never block the
+                # loop long enough to justify offloading to a thread
+                data = orjson.loads(file_path.read_bytes())
+            else:
+                async with aiofiles.open(file_path, 'rb') as f:
+                    content = await f.read()
+                    data = orjson.loads(content)
+
             logger.info(f"Loaded JSON file: {file_path}")
             return data
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON in file {file_path}: {e}")
             raise ValidationError(f"Invalid JSON format: {e}")
         except Exception as e:
             logger.error(f"Failed to load JSON file {file_path}: {e}")
             raise FileProcessingError(f"Failed to load JSON file: {e}")
     
+    @staticmethod
+    async def append_json_line(data: Dict[str, Any], file_path: Path) -> None:
+        """Append data as a single compact JSON line (write-ahead log style)."""
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            line = orjson.dumps(data, default=_orjson_default) + b"\n"
+            async with aiofiles.open(file_path, 'ab') as f:
+                await f.write(line)
+        except Exception as e:
+            logger.error(f"Failed to append JSON line to {file_path}: {e}")
+            raise FileProcessingError(f"Failed to append JSON line: {e}")
+
     @staticmethod
     async def save_uploaded_file(
         file_content: bytes, 
@@ -0,0 +1,23 @@
+"""
+Time handling utilities.
+"""
+
+from datetime import datetime, timezone
+
+# Bound once so hot callers skip the module attribute lookup per call
+_UTC = timezone.utc
+
+
+def utc_now() -> datetime:
+    """Current UTC time as a naive datetime.
+
+    Keeps the naive-UTC convention the models have always stored while
+    avoiding the deprecated datetime.utcnow (and the warning-filter cost
+    it pays on every call on newer Pythons).
+    """
+    return datetime.now(_UTC).replace(tzinfo=None)
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 string with a Z suffix."""
+    return datetime.now(_UTC).isoformat(timespec="seconds").replace("+00:00", "Z")
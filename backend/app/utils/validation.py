@@ -2,8 +2,10 @@
 Data validation utilities.
 """
 
-import json
 from typing import Dict, Any, List, Union, Tuple
+
+import orjson
+
 from ..models.agent import AgentConfig
 from ..models.message import MessageDataset, MessageType
 from .exceptions import ValidationError, DataConsistencyError
@@ -33,11 +35,8 @@ class ValidationUtils:
                 normalized_agent = ValidationUtils._normalize_agent_fields(agent, i)
                 normalized_agents.append(normalized_agent)
             
-            # Create final configuration
-            final_config = {"agents": normalized_agents}
-            
-            # Validate using Pydantic model
-            return AgentConfig(**final_config)
+            # Validate via the compiled agent-list adapter
+            return AgentConfig.from_agent_dicts(normalized_agents)
             
         except ValidationError:
             raise
@@ -256,10 +255,10 @@ class ValidationUtils:
                 args_str = tool_call["function"]["arguments"]
                 try:
                     if isinstance(args_str, str):
-                        normalized_tool_call["args"] = json.loads(args_str)
+                        normalized_tool_call["args"] = orjson.loads(args_str)
                     else:
                         normalized_tool_call["args"] = args_str
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     normalized_tool_call["args"] = {"raw_arguments": args_str}
             else:
                 normalized_tool_call["args"] = {}
@@ -307,10 +306,7 @@ class ValidationUtils:
             config_agent_names = set(agents_config.get_agent_names())
             message_agent_names = set(messages_dataset.get_unique_agents())
             message_tools = set(messages_dataset.get_unique_tools())
-            config_tools = set()
-            for agent in agents_config.agents:
-                for tool in agent.tools:
-                    config_tools.add(tool.name)
+            config_tools = agents_config.tool_names
             
             # Check for missing agents
             ValidationUtils._check_missing_agents(
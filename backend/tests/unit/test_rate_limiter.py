@@ -0,0 +1,106 @@
+"""
+Unit tests for the LLM rate limiter.
+"""
+
+import pytest
+
+from app.services.rate_limiter import AsyncTokenBucket, estimate_tokens
+
+
+class TestEstimateTokens:
+    """Tests for the token-count proxy."""
+
+    def test_estimates_four_characters_per_token(self):
+        """Test that estimates follow the ~4 characters per token rule."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd" * 25) == 25
+
+    def test_truncates_partial_tokens(self):
+        """Test that a trailing partial token is not counted."""
+        assert estimate_tokens("abc") == 0
+        assert estimate_tokens("abcdefg") == 1
+
+
+class TestAsyncTokenBucket:
+    """Tests for AsyncTokenBucket refill and wait math."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Replace the monotonic clock with a manually advanced one."""
+        state = {"now": 1000.0}
+        monkeypatch.setattr(
+            "app.services.rate_limiter.time.monotonic", lambda: state["now"]
+        )
+        return state
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch, clock):
+        """Record sleep calls and advance the fake clock instead of waiting."""
+        recorded = []
+
+        async def fake_sleep(seconds):
+            recorded.append(seconds)
+            clock["now"] += seconds
+
+        monkeypatch.setattr("app.services.rate_limiter.asyncio.sleep", fake_sleep)
+        return recorded
+
+    def test_enabled_reflects_configured_limits(self):
+        """Test that the bucket is disabled only when both limits are 0."""
+        assert not AsyncTokenBucket().enabled
+        assert AsyncTokenBucket(requests_per_minute=60).enabled
+        assert AsyncTokenBucket(tokens_per_minute=6000).enabled
+
+    @pytest.mark.asyncio
+    async def test_acquire_is_noop_when_disabled(self, sleeps):
+        """Test that an unlimited bucket never waits."""
+        bucket = AsyncTokenBucket()
+        await bucket.acquire(estimated_tokens=10**9)
+        assert sleeps == []
+
+    @pytest.mark.asyncio
+    async def test_acquire_deducts_allowances(self, clock, sleeps):
+        """Test that a request deducts one request and its tokens."""
+        bucket = AsyncTokenBucket(requests_per_minute=60, tokens_per_minute=6000)
+        await bucket.acquire(estimated_tokens=500)
+        assert bucket._request_allowance == pytest.approx(59.0)
+        assert bucket._token_allowance == pytest.approx(5500.0)
+        assert sleeps == []
+
+    def test_refill_is_proportional_to_elapsed_time(self, clock):
+        """Test that half a minute restores half of each per-minute limit."""
+        bucket = AsyncTokenBucket(requests_per_minute=60, tokens_per_minute=6000)
+        bucket._request_allowance = 0.0
+        bucket._token_allowance = 0.0
+        clock["now"] += 30.0
+        bucket._refill()
+        assert bucket._request_allowance == pytest.approx(30.0)
+        assert bucket._token_allowance == pytest.approx(3000.0)
+
+    def test_refill_caps_at_configured_limits(self, clock):
+        """Test that idle time never grows allowances past the limits."""
+        bucket = AsyncTokenBucket(requests_per_minute=60, tokens_per_minute=6000)
+        clock["now"] += 600.0
+        bucket._refill()
+        assert bucket._request_allowance == pytest.approx(60.0)
+        assert bucket._token_allowance == pytest.approx(6000.0)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_next_request_slot(self, clock, sleeps):
+        """Test the wait when the request allowance is exhausted."""
+        bucket = AsyncTokenBucket(requests_per_minute=60)
+        bucket._request_allowance = 0.0
+        await bucket.acquire()
+        # At 60 rpm one full request refills in exactly one second
+        assert sleeps == [pytest.approx(1.0)]
+        assert bucket._request_allowance == pytest.approx(0.0)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_token_budget(self, clock, sleeps):
+        """Test the wait when the token allowance cannot cover a request."""
+        bucket = AsyncTokenBucket(tokens_per_minute=600)
+        bucket._token_allowance = 100.0
+        await bucket.acquire(estimated_tokens=400)
+        # The missing 300 tokens refill at 10 tokens/second
+        assert sleeps == [pytest.approx(30.0)]
+        assert bucket._token_allowance == pytest.approx(0.0)
@@ -4,11 +4,16 @@ Unit tests for session service.
 
 import pytest
 import json
+import os
+import time
 import uuid
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from app.config import settings
+from app.models.session import Session, SessionStatus
 from app.services.session_service import SessionService
+from app.utils.cache import cache_manager
 from app.utils.exceptions import (
     SessionNotFoundError,
     FileProcessingError,
@@ -52,3 +57,99 @@ class TestSessionService:
         assert metadata["session_id"] == session_id
         assert "created_at" in metadata
         assert "status" in metadata
+
+
+class TestWalCrashRecovery:
+    """Tests for write-ahead log replay after an unclean shutdown."""
+
+    @pytest.fixture
+    def wal_service(self, tmp_path, monkeypatch):
+        """Create a session service rooted in a fresh temporary directory."""
+        monkeypatch.setattr(settings, "session_dir", tmp_path / "sessions")
+        cache_manager.clear()
+        yield SessionService()
+        cache_manager.clear()
+
+    def _seed_session(self, service, status=SessionStatus.CREATED):
+        """Write a checkpointed session.json directly to disk."""
+        session = Session(session_id=str(uuid.uuid4()), status=status)
+        session_dir = Path(service.session_dir) / session.session_id
+        session_dir.mkdir(parents=True)
+        (session_dir / "session.json").write_text(session.model_dump_json())
+        return session
+
+    @staticmethod
+    def _append_wal(service, session, status):
+        """Append a WAL snapshot of the session with the given status."""
+        updated = session.model_copy(update={"status": status})
+        wal_file = Path(service.session_dir) / session.session_id / "session.wal"
+        with open(wal_file, "a") as f:
+            f.write(updated.model_dump_json() + "\n")
+
+    @staticmethod
+    def _age_file(path, seconds=10):
+        """Push a file's mtime into the past."""
+        stamp = time.time() - seconds
+        os.utime(path, (stamp, stamp))
+
+    @pytest.mark.asyncio
+    async def test_get_session_replays_newer_wal(self, wal_service):
+        """Test that an un-checkpointed WAL entry wins over session.json."""
+        session = self._seed_session(wal_service)
+        session_file = Path(wal_service.session_dir) / session.session_id / "session.json"
+        self._age_file(session_file)
+        self._append_wal(wal_service, session, SessionStatus.ANALYZED)
+
+        loaded = await wal_service.get_session(session.session_id)
+        assert loaded.status == SessionStatus.ANALYZED
+
+    @pytest.mark.asyncio
+    async def test_get_session_ignores_checkpointed_wal(self, wal_service):
+        """Test that a WAL older than session.json is not replayed."""
+        session = self._seed_session(wal_service, status=SessionStatus.ANALYZED)
+        self._append_wal(wal_service, session, SessionStatus.CREATED)
+        wal_file = Path(wal_service.session_dir) / session.session_id / "session.wal"
+        self._age_file(wal_file)
+
+        loaded = await wal_service.get_session(session.session_id)
+        assert loaded.status == SessionStatus.ANALYZED
+
+    @pytest.mark.asyncio
+    async def test_last_wal_entry_wins(self, wal_service):
+        """Test that replay uses the most recent of several WAL entries."""
+        session = self._seed_session(wal_service)
+        session_file = Path(wal_service.session_dir) / session.session_id / "session.json"
+        self._age_file(session_file)
+        self._append_wal(wal_service, session, SessionStatus.ANALYZING)
+        self._append_wal(wal_service, session, SessionStatus.ERROR)
+
+        loaded = await wal_service.get_session(session.session_id)
+        assert loaded.status == SessionStatus.ERROR
+
+    @pytest.mark.asyncio
+    async def test_index_build_replays_newer_wal(self, wal_service):
+        """Test that listing agrees with get_session after a crash."""
+        session = self._seed_session(wal_service)
+        session_file = Path(wal_service.session_dir) / session.session_id / "session.json"
+        self._age_file(session_file)
+        self._append_wal(wal_service, session, SessionStatus.ANALYZED)
+
+        sessions = await wal_service.list_sessions(simple_format=True)
+        assert len(sessions) == 1
+        assert sessions[0].session_id == session.session_id
+        assert sessions[0].status == SessionStatus.ANALYZED
+
+    @pytest.mark.asyncio
+    async def test_flush_checkpoints_pending_wal(self, wal_service):
+        """Test that flushing folds the WAL into session.json and drops it."""
+        session = self._seed_session(wal_service)
+        session.status = SessionStatus.ANALYZED
+        await wal_service.update_session(session)
+
+        session_dir = Path(wal_service.session_dir) / session.session_id
+        assert (session_dir / "session.wal").exists()
+
+        await wal_service.flush_pending_sessions()
+        assert not (session_dir / "session.wal").exists()
+        checkpointed = json.loads((session_dir / "session.json").read_text())
+        assert checkpointed["status"] == SessionStatus.ANALYZED.value